@@ -1,5 +1,6 @@
 import streamlit as st
 from sidebar_common import show_sidebar 
+from prewarm import prewarm
 
 st.markdown("""
     <style>
@@ -14,6 +15,9 @@ st.set_page_config(page_title="ネットワーク問題体験", layout="centered
 
 show_sidebar()   
 
+# 各ページで使う重いモジュールを、ホームを開いたときにバックグラウンドで読み込んでおく
+prewarm()
+
 st.title("ネットワークの謎を解け！")
 st.subheader("〜最短経路と最大流チャレンジ〜")
 
@@ -32,3 +36,6 @@ st.markdown("### 🟡 ランダム問題")
 st.page_link("pages/shotest_random.py", label="最短経路問題（ランダム）")
 
 st.page_link("pages/maxflow_random.py", label="最大流問題（ランダム）")
+
+st.markdown("### 🟣 道路網")
+st.page_link("pages/shotest_road.py", label="最短経路問題（秋田の道路網）")
@@ -0,0 +1,208 @@
+import hashlib
+import json
+import os
+import threading
+
+import streamlit as st
+
+from graph_render import current_backend
+from rerun_timing import span
+
+
+# --- 例題ページの固定グラフと、あらかじめ作っておく図・答え ---
+# python tools/build_example_assets.py で、例題ごとに
+#   <出力先>/<例題名>/manifest.json   … ノードの並び・全ての (出発点, 終点) の答え・図のファイル名
+#   <出力先>/<例題名>/base.png / .svg … 問題の図
+#   <出力先>/<例題名>/pair-i-j.png / .svg … 答えを書き込んだ図（最短経路は赤、最大流は「流量/容量」）
+# を書き出しておくと、ページは答えも図もファイルから読むだけになり、グラフの計算はしない。
+# ファイルがない答え・図は、最初に必要になったときに計算してプロセス内で共有する（結果は同じ）。
+EXAMPLE_DIR = os.environ.get(
+    "GRAPH_EXAMPLE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "examples"))
+FIGURE_FORMATS = ("png", "svg")
+
+EXAMPLES = {
+    # 最短経路問題（例題）: 無向グラフ + 距離
+    "shortest": {
+        "directed": False,
+        "attr": "weight",
+        "edges": [
+            ("Start", "Senboku", 15),
+            ("Senboku", "Akita", 75),
+            ("Senboku", "Daisen", 40),
+            ("Akita", "Daisen", 56),
+            ("Daisen", "Yuzawa", 45),
+            ("Akita", "Goal", 42),
+            ("Daisen", "Goal", 50),
+            ("Yuzawa", "Goal", 58),
+        ],
+    },
+    # 最大流問題（例題）: 有向グラフ + 容量
+    "maxflow": {
+        "directed": True,
+        "attr": "capacity",
+        "edges": [
+            ("S", "A", 10),
+            ("S", "B", 5),
+            ("A", "B", 15),
+            ("A", "C", 9),
+            ("B", "D", 8),
+            ("B", "C", 5),
+            ("C", "T", 10),
+            ("D", "T", 10),
+        ],
+    },
+}
+
+
+def pair_key(source, target):
+    return f"{source}|{target}"
+
+
+def spec_digest(spec):
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class ExampleAssets:
+    def __init__(self, name, directory=None):
+        self.name = name
+        self.spec = EXAMPLES[name]
+        self.directory = os.path.join(directory or EXAMPLE_DIR, name)
+        # networkx にグラフを作らせたときと同じ、辺に最初に現れた順
+        self.nodes = list(dict.fromkeys(n for u, v, _ in self.spec["edges"] for n in (u, v)))
+        self._lock = threading.Lock()
+        self._graph = None
+        self._pos = None
+        self._figures = {}
+        manifest = {}
+        path = os.path.join(self.directory, "manifest.json")
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+            # グラフの定義が変わったあとの古いファイルは使わない（作り直すまでは計算で答える）
+            if manifest.get("spec") != spec_digest(self.spec):
+                manifest = {}
+        self._answers = manifest.get("answers", {})
+        self._files = manifest.get("figures", {})
+
+    def pairs(self):
+        return [(s, t) for s in self.nodes for t in self.nodes if s != t]
+
+    # --- 答え: 最短経路 {"length", "path"} か {"no_path": True}、最大流 {"flow_value", "flow"} ---
+    def answer(self, source, target):
+        key = pair_key(source, target)
+        answer = self._answers.get(key)
+        if answer is None:
+            with span("solve"):
+                answer = self._solve(source, target)
+            self._answers[key] = answer
+        return answer
+
+    def _graph_and_layout(self):
+        with self._lock:
+            if self._graph is None:
+                import networkx as nx
+                G = nx.DiGraph() if self.spec["directed"] else nx.Graph()
+                G.add_weighted_edges_from(self.spec["edges"], weight=self.spec["attr"])
+                with span("layout"):
+                    self._pos = nx.spring_layout(G, seed=42)
+                self._graph = G
+            return self._graph, self._pos
+
+    def _solve(self, source, target):
+        G, _ = self._graph_and_layout()
+        if self.spec["directed"]:
+            from graph_flow import solve_max_flow
+            result = solve_max_flow(G, source, target)
+            flow_dict = result.flow_dict()
+            return {"flow_value": result.flow_value,
+                    "flow": {pair_key(u, v): flow_dict[u][v] for u, v in G.edges}}
+        import networkx as nx
+        from graph_solver import solve_shortest_path
+        try:
+            path, length = solve_shortest_path(G, source, target)
+        except nx.NetworkXNoPath:
+            return {"no_path": True}
+        return {"length": length, "path": path}
+
+    # --- 図: key は "base" か pair_key(出発点, 終点)、fmt は "png" / "svg" ---
+    def figure(self, key, fmt):
+        data = self._figures.get((key, fmt))
+        if data is None:
+            filename = self._files.get(key, {}).get(fmt)
+            if filename:
+                with open(os.path.join(self.directory, filename), "rb") as f:
+                    data = f.read()
+            else:
+                data = self._render(key, fmt)
+            self._figures[(key, fmt)] = data
+        return data
+
+    def _render(self, key, fmt):
+        from graph_render import render_graph
+        G, pos = self._graph_and_layout()
+        attr = self.spec["attr"]
+        edge_labels = {(u, v): d for u, v, d in G.edges(data=attr)}
+        highlight = ()
+        if key != "base":
+            answer = self.answer(*key.split("|"))
+            if self.spec["directed"]:
+                edge_labels = {(u, v): f"{answer['flow'][pair_key(u, v)]}/{c}" for u, v, c in G.edges(data=attr)}
+            elif "path" in answer:
+                path = answer["path"]
+                highlight = list(zip(path[:-1], path[1:]))
+        backend = "svg" if fmt == "svg" else "matplotlib"
+        return render_graph(G, pos, edge_labels=edge_labels, node_color="lightblue",
+                            highlight_edges=highlight, fmt=fmt, backend=backend)
+
+    # --- 全ての答えと図をファイルに書き出す（tools/build_example_assets.py から使う） ---
+    def build(self, formats=FIGURE_FORMATS):
+        # 前回の manifest は使わず、答えも図もすべて作り直す
+        self._answers, self._files, self._figures = {}, {}, {}
+        os.makedirs(self.directory, exist_ok=True)
+        index = {pair_key(s, t): (i, j) for i, s in enumerate(self.nodes)
+                 for j, t in enumerate(self.nodes) if s != t}
+        keys = ["base"] + list(index)
+        files = {}
+        for key in keys:
+            stem = "base" if key == "base" else "pair-%d-%d" % index[key]
+            files[key] = {}
+            for fmt in formats:
+                filename = f"{stem}.{fmt}"
+                with open(os.path.join(self.directory, filename), "wb") as f:
+                    f.write(self._render(key, fmt))
+                files[key][fmt] = filename
+        manifest = {
+            "name": self.name,
+            "spec": spec_digest(self.spec),
+            "nodes": self.nodes,
+            "answers": {key: self.answer(*key.split("|")) for key in index},
+            "figures": files,
+        }
+        # manifest.json は最後に書く（途中で止まっても、古い manifest が新しい図を指さない）
+        tmp = os.path.join(self.directory, "manifest.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+        os.replace(tmp, os.path.join(self.directory, "manifest.json"))
+        self._answers = manifest["answers"]
+        self._files = files
+        return len(keys) * len(formats)
+
+
+_examples = {}
+_load_lock = threading.Lock()
+
+
+# 例題ごとに1つを全セッションで共有する（ファイルは最初に使われたときに読む）
+def load_example(name, directory=None):
+    directory = directory or EXAMPLE_DIR
+    with _load_lock:
+        if (name, directory) not in _examples:
+            _examples[(name, directory)] = ExampleAssets(name, directory)
+        return _examples[(name, directory)]
+
+
+def show_example_figure(assets, key):
+    fmt = "svg" if current_backend() == "svg" else "png"
+    with span("render"):
+        data = assets.figure(key, fmt)
+        st.image(data.decode("utf-8") if fmt == "svg" else data)
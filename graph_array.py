@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+
+import networkx as nx
+import numpy as np
+
+
+# --- 配列（CSR 形式）で持つコンパクトなグラフ ---
+# ノードは 0..n-1 の整数で表し、名前は labels に持つ。
+# 隣接関係は indptr / indices、辺の重み（容量）は values に入れる。
+# 無向グラフは両方向を格納する。生成後は書き換えない前提で、
+# networkx が必要な場面（描画・レイアウトなど）でだけ to_networkx() で変換する。
+class ArrayGraph:
+    def __init__(self, labels, directed, indptr, indices, values, attr="weight", graph=None, fingerprint=None):
+        self.labels = list(labels)
+        self.directed = directed
+        self.indptr = indptr
+        self.indices = indices
+        self.values = values
+        self.attr = attr
+        # networkx の G.graph と同じく、レイアウトや答えなどの付随データを入れる
+        self.graph = graph if graph is not None else {}
+        self._index = None
+        # 保存済みのフィンガープリントを渡すと計算しない（メモリマップの配列を全部読まずに済む）
+        self.graph["frozen_fingerprint"] = fingerprint or self.fingerprint()
+
+    @classmethod
+    def from_edges(cls, labels, src, dst, values, directed=False, attr="weight"):
+        n = len(labels)
+        src = np.asarray(src, dtype=np.int32)
+        dst = np.asarray(dst, dtype=np.int32)
+        values = np.asarray(values)
+        if not directed:
+            src, dst = np.concatenate([src, dst]), np.concatenate([dst, src])
+            values = np.concatenate([values, values])
+        order = np.lexsort((dst, src))
+        indptr = np.zeros(n + 1, dtype=np.int32)
+        np.cumsum(np.bincount(src, minlength=n), out=indptr[1:])
+        return cls(labels, directed, indptr, dst[order], values[order], attr=attr)
+
+    @classmethod
+    def from_networkx(cls, G, attr="weight"):
+        labels = list(G.nodes)
+        index = {n: i for i, n in enumerate(labels)}
+        edges = [(index[u], index[v], d[attr]) for u, v, d in G.edges(data=True)]
+        src, dst, values = zip(*edges) if edges else ((), (), ())
+        return cls.from_edges(labels, src, dst, values, directed=G.is_directed(), attr=attr)
+
+    def index(self, label):
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.labels)}
+        return self._index[label]
+
+    def number_of_nodes(self):
+        return len(self.labels)
+
+    def number_of_edges(self):
+        m = len(self.indices)
+        return m if self.directed else m // 2
+
+    def edge_arrays(self):
+        # 辺ごとの (始点, 終点, 値) の配列。無向グラフは片方向だけ返す
+        src = np.repeat(np.arange(len(self.labels), dtype=np.int32), np.diff(self.indptr))
+        if self.directed:
+            return src, self.indices, self.values
+        keep = src <= self.indices
+        return src[keep], self.indices[keep], self.values[keep]
+
+    def edges(self):
+        src, dst, values = self.edge_arrays()
+        labels = self.labels
+        for u, v, w in zip(src.tolist(), dst.tolist(), values.tolist()):
+            yield labels[u], labels[v], w
+
+    def to_networkx(self):
+        H = nx.DiGraph() if self.directed else nx.Graph()
+        H.add_nodes_from(self.labels)
+        H.add_edges_from((u, v, {self.attr: w}) for u, v, w in self.edges())
+        # 付随データは共有する（変換後のグラフに保存したレイアウトなども残る）
+        H.graph = self.graph
+        return H
+
+    def fingerprint(self):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(b"D" if self.directed else b"U")
+        h.update(repr(self.labels).encode())
+        h.update(self.attr.encode())
+        for array in (self.indptr, self.indices, self.values):
+            h.update(array.dtype.str.encode())
+            h.update(np.ascontiguousarray(array).tobytes())
+        return h.hexdigest()
+
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.values.nbytes
+
+    # --- ディレクトリへの保存と、メモリマップでの読み込み ---
+    # 配列は .npy で保存し、mmap_mode="r" で読むと必要な部分だけがディスクから読まれる
+    # （大きな道路網でも起動時にファイル全体をメモリに載せない）。
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        np.save(os.path.join(directory, "indptr.npy"), self.indptr)
+        np.save(os.path.join(directory, "indices.npy"), self.indices)
+        np.save(os.path.join(directory, "values.npy"), self.values)
+        with open(os.path.join(directory, "graph.json"), "w", encoding="utf-8") as f:
+            json.dump({"directed": self.directed, "attr": self.attr, "labels": self.labels,
+                       "fingerprint": self.graph["frozen_fingerprint"]}, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        with open(os.path.join(directory, "graph.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        arrays = [np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mmap_mode)
+                  for name in ("indptr", "indices", "values")]
+        # フィンガープリントのない古い保存ファイルは、読み込むときに計算する（配列を全部読む）
+        return cls(meta["labels"], meta["directed"], *arrays, attr=meta["attr"], fingerprint=meta.get("fingerprint"))
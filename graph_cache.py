@@ -0,0 +1,111 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# --- 全セッション共通の LRU キャッシュ ---
+# 件数と合計サイズ（sizeof で測る）の両方で上限を設け、古いものから追い出す。
+class LRUCache:
+    def __init__(self, max_entries=256, max_bytes=None, sizeof=len):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.sizeof = sizeof
+        self._data = OrderedDict()
+        self._sizes = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        size = self.sizeof(value) if self.max_bytes is not None else 0
+        # 1件で上限を超えるものはキャッシュしない
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= self._sizes.pop(key)
+                del self._data[key]
+            self._data[key] = value
+            self._sizes[key] = size
+            self._bytes += size
+            while len(self._data) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                old_key, _ = self._data.popitem(last=False)
+                self._bytes -= self._sizes.pop(old_key)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._sizes.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _canonical(value):
+    # 浮動小数点の誤差でキーが変わらないよう丸めてから文字列化
+    if isinstance(value, float):
+        return repr(round(value, 6))
+    if isinstance(value, (tuple, list)):
+        return "(" + ",".join(_canonical(v) for v in value) + ")"
+    if isinstance(value, dict):
+        items = sorted((_canonical(k), _canonical(v)) for k, v in value.items())
+        return "{" + ",".join(f"{k}:{v}" for k, v in items) + "}"
+    if hasattr(value, "tolist"):
+        return _canonical(value.tolist())
+    return repr(value)
+
+
+def graph_fingerprint(G, pos=None, **extra):
+    h = hashlib.blake2b(digest_size=16)
+    h.update(b"D" if G.is_directed() else b"U")
+    # ArrayGraph から変換したグラフは、配列から計算済みの値をそのまま使う
+    frozen = G.graph.get("frozen_fingerprint")
+    if frozen is not None:
+        h.update(frozen.encode())
+        return _fingerprint_extra(h, pos, extra)
+    for node in sorted(G.nodes, key=repr):
+        h.update(_canonical(node).encode())
+        h.update(b";")
+    h.update(b"|")
+    edges = []
+    for u, v, d in G.edges(data=True):
+        u, v = _canonical(u), _canonical(v)
+        # 無向グラフは辺の向きに依存しないよう端点を並べ替える
+        if not G.is_directed() and v < u:
+            u, v = v, u
+        edges.append((u, v, _canonical(d)))
+    edges.sort()
+    for edge in edges:
+        h.update(",".join(edge).encode())
+        h.update(b";")
+    return _fingerprint_extra(h, pos, extra)
+
+
+def _fingerprint_extra(h, pos, extra):
+    if pos is not None:
+        h.update(b"|pos")
+        h.update(_canonical({n: tuple(p) for n, p in pos.items()}).encode())
+    for key in sorted(extra):
+        h.update(f"|{key}=".encode())
+        h.update(_canonical(extra[key]).encode())
+    return h.hexdigest()
@@ -0,0 +1,386 @@
+from collections import deque
+
+import networkx as nx
+import numpy as np
+
+from graph_array import ArrayGraph
+from solution_cache import solution_cache
+
+
+# --- 配列グラフ上の最大流 ---
+# 残余ネットワークを「弧」の配列で持つ。元の辺 e に対して順方向の弧と逆方向の弧を作り、
+# 弧は始点ごとにまとめて並べる（CSR と同じ形）。ループ内で 1 要素ずつ触るため、
+# NumPy で組み立てたあと Python のリストに変換して使う。
+class FlowNetwork:
+    def __init__(self, graph, capacity="capacity"):
+        if not isinstance(graph, ArrayGraph):
+            graph = ArrayGraph.from_networkx(graph, capacity)
+        self.graph = graph
+        n = graph.number_of_nodes()
+        src, dst, cap = graph.edge_arrays()
+        m = len(src)
+        self.n, self.m = n, m
+
+        tail = np.concatenate([src, dst])
+        head = np.concatenate([dst, src])
+        # 無向辺はどちらの向きにも容量いっぱいまで流せる
+        back = cap if not graph.directed else np.zeros_like(cap)
+        arc_cap = np.concatenate([cap, back])
+        order = np.argsort(tail, kind="stable")
+        position = np.empty(2 * m, dtype=np.int64)
+        position[order] = np.arange(2 * m)
+        pair = np.concatenate([np.arange(m, 2 * m), np.arange(m)])
+
+        self.start = np.concatenate(([0], np.cumsum(np.bincount(tail, minlength=n)))).tolist()
+        self.head = head[order].tolist()
+        self.cap = arc_cap[order].tolist()
+        self.rev = position[pair[order]].tolist()
+        # 元の辺 e の順方向の弧が何番目に並んでいるか
+        self.edge_arc = position[:m].tolist()
+        self.edge_src = src.tolist()
+        self.edge_dst = dst.tolist()
+        self.edge_cap = cap.tolist()
+
+    def solve(self, source, target, method="dinic"):
+        graph = self.graph
+        if source not in graph.labels:
+            raise nx.NetworkXError(f"node {source} not in graph")
+        if target not in graph.labels:
+            raise nx.NetworkXError(f"node {target} not in graph")
+        if source == target:
+            raise nx.NetworkXError("source and sink are the same node")
+        s, t = graph.index(source), graph.index(target)
+        residual = list(self.cap)
+        if method == "dinic":
+            value = _dinic(self.n, self.start, self.head, self.rev, residual, s, t)
+        elif method == "push_relabel":
+            value = _push_relabel(self.n, self.start, self.head, self.rev, residual, s, t)
+        else:
+            raise nx.NetworkXError(f"unknown max-flow method: {method}")
+        return MaxFlowResult(self, value, residual, s)
+
+
+# --- 結果: 最大流量・辺ごとの流量・最小カット ---
+class MaxFlowResult:
+    def __init__(self, network, flow_value, residual, s):
+        self.network = network
+        self.flow_value = flow_value
+        self.residual = residual
+        self._s = s
+
+    def edge_flows(self):
+        net = self.network
+        return [cap - self.residual[arc] for arc, cap in zip(net.edge_arc, net.edge_cap)]
+
+    def flow_dict(self):
+        # nx.maximum_flow と同じ {u: {v: 流量}} の形
+        net = self.network
+        labels = net.graph.labels
+        flow = {u: {} for u in labels}
+        for u, v, f in zip(net.edge_src, net.edge_dst, self.edge_flows()):
+            flow[labels[u]][labels[v]] = f
+            if not net.graph.directed:
+                flow[labels[v]][labels[u]] = -f
+        return flow
+
+    def min_cut(self):
+        # 残余ネットワークで出発点から到達できる側 / できない側
+        net = self.network
+        seen = [False] * net.n
+        seen[self._s] = True
+        queue = deque([self._s])
+        while queue:
+            u = queue.popleft()
+            for a in range(net.start[u], net.start[u + 1]):
+                v = net.head[a]
+                if self.residual[a] > 0 and not seen[v]:
+                    seen[v] = True
+                    queue.append(v)
+        labels = net.graph.labels
+        reachable = {labels[i] for i in range(net.n) if seen[i]}
+        return reachable, set(labels) - reachable
+
+    def cut_edges(self):
+        reachable, _ = self.min_cut()
+        labels = self.network.graph.labels
+        return [(labels[u], labels[v]) for u, v in zip(self.network.edge_src, self.network.edge_dst)
+                if labels[u] in reachable and labels[v] not in reachable]
+
+
+# Dinic 法: BFS でレベルグラフを作り、current-arc を使った DFS でブロッキングフローを流す
+def _dinic(n, start, head, rev, cap, s, t):
+    total = 0
+    while True:
+        level = [-1] * n
+        level[s] = 0
+        queue = deque([s])
+        while queue:
+            u = queue.popleft()
+            for a in range(start[u], start[u + 1]):
+                v = head[a]
+                if cap[a] > 0 and level[v] < 0:
+                    level[v] = level[u] + 1
+                    queue.append(v)
+        if level[t] < 0:
+            return total
+
+        current = start[:-1]
+        path = []
+        u = s
+        while True:
+            if u == t:
+                # 経路上の最小残余容量だけ流し、飽和した弧の手前まで戻る
+                pushed = min(cap[a] for a in path)
+                total += pushed
+                back_to = None
+                for i, a in enumerate(path):
+                    cap[a] -= pushed
+                    cap[rev[a]] += pushed
+                    if back_to is None and cap[a] == 0:
+                        back_to = i
+                del path[back_to:]
+                u = head[path[-1]] if path else s
+                continue
+            end = start[u + 1]
+            a = current[u]
+            next_level = level[u] + 1
+            while a < end and not (cap[a] > 0 and level[head[a]] == next_level):
+                a += 1
+            current[u] = a
+            if a < end:
+                path.append(a)
+                u = head[a]
+            else:
+                # 行き止まり: このノードは今回のフェーズでは使わない
+                level[u] = -1
+                if not path:
+                    break
+                a = path.pop()
+                u = head[rev[a]]
+                current[u] += 1
+
+
+# プッシュ・再ラベル法（FIFO 順 + ギャップ法）
+def _push_relabel(n, start, head, rev, cap, s, t):
+    excess = [0] * n
+    height = [0] * n
+    count = [0] * (2 * n + 1)
+
+    # 終点からの逆向き BFS で高さを初期化（グローバル再ラベル）
+    dist = [-1] * n
+    dist[t] = 0
+    queue = deque([t])
+    while queue:
+        v = queue.popleft()
+        for a in range(start[v], start[v + 1]):
+            u = head[a]
+            if dist[u] < 0 and cap[rev[a]] > 0:
+                dist[u] = dist[v] + 1
+                queue.append(u)
+    for u in range(n):
+        height[u] = dist[u] if dist[u] >= 0 else n
+    height[s] = n
+    for u in range(n):
+        count[height[u]] += 1
+
+    active = deque()
+    for a in range(start[s], start[s + 1]):
+        f = cap[a]
+        if f > 0:
+            v = head[a]
+            cap[a] = 0
+            cap[rev[a]] += f
+            excess[v] += f
+            excess[s] -= f
+            if v != t and excess[v] == f:
+                active.append(v)
+
+    current = start[:-1]
+    while active:
+        u = active.popleft()
+        while excess[u] > 0:
+            a = current[u]
+            if a == start[u + 1]:
+                # 再ラベル: 残余容量のある弧の先で最も低い高さ + 1
+                old = height[u]
+                new = 2 * n
+                for b in range(start[u], start[u + 1]):
+                    if cap[b] > 0 and height[head[b]] + 1 < new:
+                        new = height[head[b]] + 1
+                count[old] -= 1
+                height[u] = new
+                count[new] += 1
+                current[u] = start[u]
+                # ギャップ法: 高さ old のノードがいなくなったら、それより上は終点に届かない
+                if count[old] == 0 and old < n:
+                    for v in range(n):
+                        if old < height[v] < n and v != s:
+                            count[height[v]] -= 1
+                            height[v] = n + 1
+                            count[n + 1] += 1
+                continue
+            v = head[a]
+            if cap[a] > 0 and height[u] == height[v] + 1:
+                f = min(excess[u], cap[a])
+                cap[a] -= f
+                cap[rev[a]] += f
+                excess[u] -= f
+                if v != s and v != t and excess[v] == 0:
+                    active.append(v)
+                excess[v] += f
+            else:
+                current[u] = a + 1
+    return excess[t]
+
+
+def maximum_flow(G, source, target, capacity="capacity", method="dinic"):
+    return FlowNetwork(G, capacity).solve(source, target, method=method)
+
+
+# --- 最大流量と辺ごとの流量だけを持つ答え（全セッションで共有するキャッシュに入れる形） ---
+class FlowSolution:
+    def __init__(self, flow_value, flow):
+        self.flow_value = flow_value
+        self.flow = flow
+
+    def flow_dict(self):
+        # 呼び出し側が書き換えてもキャッシュに影響しないようコピーを返す
+        return {u: dict(row) for u, row in self.flow.items()}
+
+
+def _encode_flow(solution, index):
+    flow = {(index[u], index[v]): f for u, row in solution.flow.items() for v, f in row.items()}
+    return solution.flow_value, flow
+
+
+def _decode_flow(value, order):
+    flow_value, edges = value
+    flow = {u: {} for u in order}
+    for (i, j), f in edges.items():
+        flow[order[i]][order[j]] = f
+    return FlowSolution(flow_value, flow)
+
+
+# 最大流を解く（同じグラフ・同じ組の答えは solution_cache から返す）
+def solve_max_flow(G, source, target, capacity="capacity"):
+    def solve():
+        result = maximum_flow(G, source, target, capacity=capacity)
+        return FlowSolution(result.flow_value, result.flow_dict())
+    return solution_cache.lookup("max_flow", G, capacity, (source, target), solve, _encode_flow, _decode_flow)
+
+
+# --- 辺の追加・容量の増加に合わせた差分計算（自作グラフ向け） ---
+# 辺を足したり容量を増やしたりしても、前回の流れはそのまま実行可能な流れなので、
+# (出発点, 終点) ごとに残余ネットワーク residual[u][v] を覚えておき、
+# 変わった辺の残余容量だけを足してから増加路を探す。
+# 辺が消えた・容量が減ったときは前回の流れが使えないので、最初から解き直す。
+class IncrementalMaxFlow:
+    def __init__(self, capacity="capacity", max_pairs=16):
+        self.capacity = capacity
+        self.max_pairs = max_pairs
+        self._states = {}
+        self.full_solves = 0
+        self.incremental_solves = 0
+
+    def _capacities(self, G):
+        # 無向グラフは両方向に同じ容量があるとみなす（自己ループは流れに関係しない）
+        caps = {}
+        for u, v, c in G.edges(data=self.capacity):
+            if u != v:
+                caps[(u, v)] = c
+                if not G.is_directed():
+                    caps[(v, u)] = c
+        return caps
+
+    def solve(self, G, source, target):
+        if source not in G:
+            raise nx.NetworkXError(f"node {source} not in graph")
+        if target not in G:
+            raise nx.NetworkXError(f"node {target} not in graph")
+        if source == target:
+            raise nx.NetworkXError("source and sink are the same node")
+        caps = self._capacities(G)
+        key = (source, target)
+        state = self._states.pop(key, None)
+        if (state is not None and state["directed"] == G.is_directed()
+                and all(caps.get(e, -1) >= c for e, c in state["caps"].items())):
+            residual, value = state["residual"], state["value"]
+            for (u, v), c in caps.items():
+                delta = c - state["caps"].get((u, v), 0)
+                if delta:
+                    row = residual.setdefault(u, {})
+                    row[v] = row.get(v, 0) + delta
+                    residual.setdefault(v, {}).setdefault(u, 0)
+            value += _augment(residual, source, target)
+            self.incremental_solves += 1
+        else:
+            solution = solve_max_flow(G, source, target, capacity=self.capacity)
+            residual, value = _residual_from_flow(G, caps, solution.flow), solution.flow_value
+            self.full_solves += 1
+        # 最近使った組だけを残す
+        self._states[key] = {"directed": G.is_directed(), "caps": caps, "residual": residual, "value": value}
+        while len(self._states) > self.max_pairs:
+            del self._states[next(iter(self._states))]
+        return ResidualFlowResult(G, caps, residual, value)
+
+
+# 辺ごとの流量から残余容量 residual[u][v] = 容量(u→v) - 流量(u→v) + 流量(v→u) を作る
+# （無向グラフの flow[u][v] は向きつきの流量で、flow[v][u] = -flow[u][v]）
+def _residual_from_flow(G, caps, flow):
+    residual = {u: {} for u in G}
+    for (u, v), c in caps.items():
+        f = flow[u][v]
+        if G.is_directed():
+            # 有向辺 u→v は、u→v に残りの容量、v→u に流した分だけ戻せる枠を作る
+            residual[u][v] = residual[u].get(v, 0) + c - f
+            residual[v][u] = residual[v].get(u, 0) + f
+        else:
+            residual[u][v] = c - f
+    return residual
+
+
+# 幅優先探索で増加路を見つけては流す（Edmonds–Karp）。追加で流せた量を返す
+def _augment(residual, s, t):
+    total = 0
+    while True:
+        parent = {s: None}
+        queue = deque([s])
+        while queue and t not in parent:
+            u = queue.popleft()
+            for v, r in residual.get(u, {}).items():
+                if r > 0 and v not in parent:
+                    parent[v] = u
+                    queue.append(v)
+        if t not in parent:
+            return total
+        path = []
+        v = t
+        while parent[v] is not None:
+            path.append((parent[v], v))
+            v = parent[v]
+        pushed = min(residual[u][v] for u, v in path)
+        for u, v in path:
+            residual[u][v] -= pushed
+            residual[v][u] += pushed
+        total += pushed
+
+
+# 差分計算の結果。MaxFlowResult と同じく flow_value と flow_dict() を持つ
+class ResidualFlowResult:
+    def __init__(self, G, caps, residual, flow_value):
+        self.G = G
+        self.caps = caps
+        self.residual = residual
+        self.flow_value = flow_value
+
+    def flow_dict(self):
+        # residual[u][v] = 容量(u→v) - 流量(u→v) + 流量(v→u) から辺ごとの流量を戻す
+        flow = {u: {} for u in self.G}
+        for (u, v), c in self.caps.items():
+            f = c - self.residual[u][v]
+            if self.G.is_directed() and (v, u) in self.caps:
+                f = max(f, 0)
+            flow[u][v] = f
+        for u, v in nx.selfloop_edges(self.G):
+            flow[u][v] = 0
+        return flow
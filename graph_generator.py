@@ -0,0 +1,58 @@
+import numpy as np
+
+from graph_array import ArrayGraph
+
+
+# --- ノード名: A, B, ..., Z, AA, AB, ... （表計算ソフトの列名と同じ並び） ---
+def node_label(i):
+    name = ""
+    i += 1
+    while i > 0:
+        i, r = divmod(i - 1, 26)
+        name = chr(65 + r) + name
+    return name
+
+
+def node_names(n):
+    return [node_label(i) for i in range(n)]
+
+
+# --- 連結なランダム重み付きグラフを NumPy でまとめて生成する ---
+# 1. 全域木: ノード i（i ≥ 1）を、それより前のノードのどれかにつなぐ
+# 2. 追加の辺: 候補をまとめて引き、自己ループ・重複・木の辺を除く
+# extra を省略すると n//2〜n 本（これまでのページと同じ）、density を
+# 指定するとノード1つあたり density 本を追加しようとする。
+# directed=True のときは各辺の向きをランダムに決める。
+def random_connected_graph(n, extra=None, density=None, weight_range=(5, 99), directed=False,
+                           attr="weight", seed=None):
+    rng = np.random.default_rng(seed)
+    labels = node_names(n)
+    if n < 2:
+        return ArrayGraph.from_edges(labels, [], [], np.array([], dtype=np.int64), directed=directed, attr=attr)
+
+    child = np.arange(1, n, dtype=np.int64)
+    parent = (rng.random(n - 1) * child).astype(np.int64)
+
+    if extra is None:
+        extra = int(round(density * n)) if density is not None else int(rng.integers(n // 2, n + 1))
+    u = rng.integers(0, n, size=extra, dtype=np.int64)
+    v = rng.integers(0, n, size=extra, dtype=np.int64)
+    keep = u != v
+    u, v = u[keep], v[keep]
+
+    # 無向の辺を (小さい番号, 大きい番号) のキーにして重複を除く
+    tree_keys = np.minimum(parent, child) * n + np.maximum(parent, child)
+    keys = np.minimum(u, v) * n + np.maximum(u, v)
+    keys, first = np.unique(keys, return_index=True)
+    new = ~np.isin(keys, tree_keys)
+    first = np.sort(first[new])
+    u, v = u[first], v[first]
+
+    src = np.concatenate([parent, u])
+    dst = np.concatenate([child, v])
+    low, high = weight_range
+    weights = rng.integers(low, high + 1, size=len(src), dtype=np.int64)
+    if directed:
+        flip = rng.random(len(src)) < 0.5
+        src, dst = np.where(flip, dst, src), np.where(flip, src, dst)
+    return ArrayGraph.from_edges(labels, src, dst, weights, directed=directed, attr=attr)
@@ -0,0 +1,273 @@
+import csv
+import functools
+import io
+import json
+import math
+import xml.etree.ElementTree as ET
+
+import networkx as nx
+import streamlit as st
+
+from graph_solver import all_pairs_max_flow, all_pairs_shortest_paths
+
+
+# --- グラフのまとめて読み込み・書き出し（自作グラフのページ向け） ---
+# 対応形式:
+#   edgelist: 1行に「始点 終点 値」（空白区切り、# 以降はコメント）
+#   csv:      「始点,終点,値」。1行目が見出し（source,target,... など）でもよい
+#   graphml:  networkx などで書き出した GraphML
+#   json:     {"nodes": [...], "edges": [[始点, 終点, 値], ...]} か、
+#             networkx の node-link 形式（{"nodes": [{"id": ...}], "links": [...]}）
+# 1行（1要素）ずつ読みながらグラフに入れるので、大きなファイルでも全体を文字列にしない。
+FORMATS = {
+    "edgelist": "辺リスト（空白区切り）",
+    "csv": "CSV",
+    "graphml": "GraphML",
+    "json": "JSON",
+}
+
+_EXTENSIONS = {".txt": "edgelist", ".edges": "edgelist", ".csv": "csv",
+               ".graphml": "graphml", ".xml": "graphml", ".json": "json"}
+
+
+class GraphImportError(ValueError):
+    pass
+
+
+def guess_format(name=None, head=""):
+    if name:
+        for ext, fmt in _EXTENSIONS.items():
+            if name.lower().endswith(ext):
+                return fmt
+    head = head.lstrip()
+    if head.startswith("<"):
+        return "graphml"
+    if head.startswith(("{", "[")):
+        return "json"
+    first_line = head.split("\n", 1)[0]
+    return "csv" if "," in first_line else "edgelist"
+
+
+def _number(text, cast, where):
+    try:
+        value = float(text)
+    except (TypeError, ValueError):
+        raise GraphImportError(f"{where}: 数値ではありません: {text!r}")
+    # nan や inf は float() では読めてしまうので、ここで弾く
+    if not math.isfinite(value):
+        raise GraphImportError(f"{where}: 有限の数にしてください: {text!r}")
+    if value <= 0:
+        raise GraphImportError(f"{where}: 値は正の数にしてください: {text!r}")
+    if cast is int and not value.is_integer():
+        raise GraphImportError(f"{where}: 値は整数にしてください: {text!r}")
+    return cast(value)
+
+
+def _edgelist_rows(lines, cast):
+    for lineno, line in enumerate(lines, 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+        parts = line.split()
+        if len(parts) == 1:
+            yield parts[0], None, None
+        elif len(parts) in (2, 3):
+            value = _number(parts[2], cast, f"{lineno}行目") if len(parts) == 3 else cast(1)
+            yield parts[0], parts[1], value
+        else:
+            raise GraphImportError(f"{lineno}行目: 「始点 終点 値」の形になっていません")
+
+
+def _csv_rows(lines, cast):
+    reader = csv.reader(lines)
+    for lineno, row in enumerate(reader, 1):
+        row = [cell.strip() for cell in row]
+        if not row or not any(row) or row[0].startswith("#"):
+            continue
+        if lineno == 1 and len(row) >= 3:
+            try:
+                float(row[2])
+            except ValueError:
+                continue  # 見出しの行
+        if len(row) == 1:
+            yield row[0], None, None
+        elif len(row) == 2 or not row[2]:
+            yield row[0], row[1], cast(1)
+        else:
+            yield row[0], row[1], _number(row[2], cast, f"{lineno}行目")
+
+
+def _graphml_rows(stream, cast, attr):
+    # 辺の値は key の attr.name が attr（weight / capacity）のデータを使う
+    keys = {}
+    try:
+        for _, elem in ET.iterparse(stream, events=("end",)):
+            name = _local_name(elem)
+            if name == "key":
+                keys[elem.get("id")] = elem.get("attr.name")
+            elif name == "node":
+                yield elem.get("id"), None, None
+                elem.clear()
+            elif name == "edge":
+                value = cast(1)
+                for data in elem:
+                    if _local_name(data) == "data" and keys.get(data.get("key"), data.get("key")) == attr:
+                        value = _number(data.text, cast, f"辺 {elem.get('source')}→{elem.get('target')}")
+                yield elem.get("source"), elem.get("target"), value
+                elem.clear()
+    except ET.ParseError as e:
+        raise GraphImportError(f"GraphML を読めません: {e}")
+
+
+def _local_name(elem):
+    # "{名前空間}edge" → "edge"
+    return elem.tag.rsplit("}", 1)[-1]
+
+
+def _json_rows(stream, cast, attr):
+    # JSON は標準ライブラリでは逐次読みできないので、ここだけ全体を読み込む
+    try:
+        data = json.load(stream)
+    except json.JSONDecodeError as e:
+        raise GraphImportError(f"JSON を読めません: {e}")
+    if isinstance(data, list):
+        data = {"edges": data}
+    for node in data.get("nodes", []):
+        yield str(node["id"] if isinstance(node, dict) else node), None, None
+    for i, edge in enumerate(data.get("edges", data.get("links", [])), 1):
+        if isinstance(edge, dict):
+            if "source" not in edge or "target" not in edge:
+                raise GraphImportError(f"{i}本目の辺: source と target がありません")
+            u, v, value = edge["source"], edge["target"], edge.get(attr, 1)
+        elif len(edge) in (2, 3):
+            u, v, value = edge[0], edge[1], edge[2] if len(edge) == 3 else 1
+        else:
+            raise GraphImportError(f"{i}本目の辺: [始点, 終点, 値] の形になっていません")
+        yield str(u), str(v), _number(value, cast, f"{i}本目の辺")
+
+
+def iter_rows(stream, fmt, attr="weight", cast=float):
+    # (始点, 終点, 値) を1つずつ返す。終点が None の行はノードだけの行
+    if fmt == "graphml":
+        return _graphml_rows(stream, cast, attr)
+    text = stream if isinstance(stream, io.TextIOBase) else io.TextIOWrapper(stream, encoding="utf-8-sig")
+    if fmt == "json":
+        return _json_rows(text, cast, attr)
+    if fmt == "csv":
+        return _csv_rows(text, cast)
+    if fmt == "edgelist":
+        return _edgelist_rows(text, cast)
+    raise GraphImportError(f"対応していない形式です: {fmt}")
+
+
+def read_graph(stream, fmt, directed=False, attr="weight", cast=float, G=None):
+    # G を渡すとそのグラフに付け足す（渡さなければ新しいグラフを作る）
+    if G is None:
+        G = nx.DiGraph() if directed else nx.Graph()
+    nodes, edges = [], []
+    for u, v, value in iter_rows(stream, fmt, attr=attr, cast=cast):
+        if v is None:
+            nodes.append(u)
+        else:
+            edges.append((u, v, {attr: value}))
+        # 一定数ごとにまとめて入れる（行ごとに add_edge するより速い）
+        if len(edges) >= 1024:
+            G.add_edges_from(edges)
+            edges.clear()
+    G.add_nodes_from(nodes)
+    G.add_edges_from(edges)
+    return G
+
+
+def write_graph(G, fmt, attr="weight"):
+    if fmt == "edgelist":
+        return "".join(f"{u} {v} {_plain(d[attr])}\n" for u, v, d in G.edges(data=True))
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out, lineterminator="\n")
+        writer.writerow(["source", "target", attr])
+        writer.writerows((u, v, _plain(d[attr])) for u, v, d in G.edges(data=True))
+        return out.getvalue()
+    if fmt == "graphml":
+        H = G.copy()
+        H.graph.clear()
+        return "\n".join(nx.generate_graphml(H))
+    if fmt == "json":
+        return json.dumps({
+            "directed": G.is_directed(),
+            "nodes": list(G.nodes),
+            "edges": [[u, v, _plain(d[attr])] for u, v, d in G.edges(data=True)],
+        }, ensure_ascii=False)
+    raise GraphImportError(f"対応していない形式です: {fmt}")
+
+
+def _plain(value):
+    # 1.0 のような値は 1 と書き出す
+    return int(value) if float(value).is_integer() else value
+
+
+# 全ての (出発点, 到達点) の答えを CSV にする
+def answers_csv(G, kind):
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    if kind == "shortest_path":
+        writer.writerow(["source", "target", "length", "path"])
+        for source, tree in all_pairs_shortest_paths(G).items():
+            for target in G:
+                if target != source and tree.reachable(target):
+                    writer.writerow([source, target, _plain(tree.length(target)), " ".join(tree.path(target))])
+    else:
+        writer.writerow(["source", "target", "max_flow"])
+        for (source, target), (reachable, value, _) in all_pairs_max_flow(G).items():
+            writer.writerow([source, target, value])
+    return out.getvalue()
+
+
+# --- 読み込み・書き出しの画面部品 ---
+# 読み込んだときは新しいグラフを返す（ページ側でセッションのグラフを差し替える）
+def graph_io_panel(G, key, kind, attr="weight", cast=float):
+    new_graph = None
+    with st.expander("📂 グラフをまとめて読み込む・書き出す"):
+        st.markdown("辺リスト・CSV・GraphML・JSON のファイルか、貼り付けたテキストからまとめて読み込めます。"
+                    "1行に「始点 終点 値」のように書きます。")
+        upload = st.file_uploader("ファイル", type=["txt", "edges", "csv", "graphml", "xml", "json"],
+                                  key=f"{key}_upload")
+        pasted = st.text_area("または貼り付け", key=f"{key}_paste", height=120,
+                              placeholder="A B 5\nB C 3\nA C 9")
+        formats = ["auto"] + list(FORMATS)
+        fmt = st.selectbox("形式", formats, key=f"{key}_format",
+                           format_func=lambda f: "自動判定" if f == "auto" else FORMATS[f])
+        append = st.checkbox("今のグラフに付け足す", key=f"{key}_append")
+        if st.button("読み込む", key=f"{key}_load"):
+            if upload is None and not pasted.strip():
+                st.warning("ファイルを選ぶか、テキストを貼り付けてください。")
+            else:
+                if upload is not None:
+                    stream, name = upload, upload.name
+                    head = upload.getvalue()[:64].decode("utf-8", "ignore")
+                else:
+                    stream, name, head = io.BytesIO(pasted.encode()), None, pasted[:64]
+                if fmt == "auto":
+                    fmt = guess_format(name, head)
+                try:
+                    base = G.copy() if append else None
+                    new_graph = read_graph(stream, fmt, directed=G.is_directed(), attr=attr, cast=cast, G=base)
+                    new_graph.graph.clear()
+                except (GraphImportError, KeyError, TypeError) as e:
+                    st.error(f"読み込めませんでした: {e}")
+
+        if len(G.edges) > 0:
+            st.markdown("**書き出し**")
+            out_fmt = st.selectbox("書き出す形式", list(FORMATS), key=f"{key}_export_format",
+                                   format_func=FORMATS.get)
+            ext = {"edgelist": "txt", "csv": "csv", "graphml": "graphml", "json": "json"}[out_fmt]
+            col1, col2 = st.columns(2)
+            with col1:
+                # 書き出しも答えと同じく、ボタンが押されたときにだけ作る
+                st.download_button("グラフを保存", functools.partial(write_graph, G.copy(), out_fmt, attr=attr),
+                                   file_name=f"graph.{ext}", key=f"{key}_download_graph")
+            with col2:
+                # 全ての組の答えはボタンが押されたときにだけ計算する
+                st.download_button("全ての組の答えを保存（CSV）", functools.partial(answers_csv, G.copy(), kind),
+                                   file_name="answers.csv", mime="text/csv", key=f"{key}_download_answers")
+    return new_graph
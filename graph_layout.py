@@ -0,0 +1,241 @@
+import random
+
+import networkx as nx
+import numpy as np
+import streamlit as st
+
+from graph_cache import graph_fingerprint
+from rerun_timing import span
+
+
+# --- 前回の配置を初期値にした差分レイアウト ---
+# 既存ノードは前回の座標から、新しいノードは隣接ノードの近くから
+# 少ない反復回数で配置を整えるので、ノードが大きく飛び回らない。
+def incremental_layout(G, pos, iterations=10, seed=42):
+    init = {n: tuple(pos[n]) for n in G if n in pos}
+    if not init:
+        return nx.spring_layout(G, seed=seed)
+
+    rng = random.Random(seed + len(G))
+    xs = [p[0] for p in init.values()]
+    ys = [p[1] for p in init.values()]
+    # 既存ノードが1つだけでも重ならないよう、最低限の広さを確保する
+    half_w = max((max(xs) - min(xs)) / 2, 0.5)
+    half_h = max((max(ys) - min(ys)) / 2, 0.5)
+    cx0, cy0 = (max(xs) + min(xs)) / 2, (max(ys) + min(ys)) / 2
+    for n in G:
+        if n in init:
+            continue
+        placed = [init[m] for m in nx.all_neighbors(G, n) if m in init]
+        if placed:
+            cx = sum(p[0] for p in placed) / len(placed)
+            cy = sum(p[1] for p in placed) / len(placed)
+            init[n] = (cx + rng.uniform(-0.1, 0.1), cy + rng.uniform(-0.1, 0.1))
+        else:
+            init[n] = (cx0 + rng.uniform(-half_w, half_w), cy0 + rng.uniform(-half_h, half_h))
+    return nx.spring_layout(G, pos=init, iterations=iterations, seed=seed)
+
+
+# --- セッションに保存した配置を使い回す ---
+# グラフが変わっていなければ保存済みの座標をそのまま返し、
+# 変わっていれば差分レイアウト、full=True のときだけ全体を計算し直す。
+def session_layout(G, state_key, full=False, seed=42):
+    with span("layout"):
+        state = st.session_state.get(state_key)
+        sig = graph_fingerprint(G)
+        if full or state is None:
+            pos = nx.spring_layout(G, seed=seed)
+        elif state["sig"] == sig:
+            return state["pos"]
+        else:
+            pos = incremental_layout(G, state["pos"], seed=seed)
+        st.session_state[state_key] = {"sig": sig, "pos": pos}
+        return pos
+
+
+# --- 大きなグラフ向けのレイアウトエンジン ---
+def _node_index(G):
+    nodes = list(G.nodes)
+    index = {n: i for i, n in enumerate(nodes)}
+    edges = np.array([(index[u], index[v]) for u, v in G.edges if u != v], dtype=np.int64).reshape(-1, 2)
+    return nodes, edges
+
+
+def _rescale(coords):
+    # networkx の rescale_layout と同じく、中心 0・最大絶対値 1 に揃える
+    coords = coords - coords.mean(axis=0)
+    lim = np.abs(coords).max()
+    if lim > 0:
+        coords = coords / lim
+    return coords
+
+
+def _within_cell_pairs(cell, n_cells):
+    # 同じセルに入っているノード同士の組（i, j）をまとめて作る
+    order = np.argsort(cell, kind="stable")
+    sizes = np.bincount(cell, minlength=n_cells)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    per_node = sizes[cell[order]]
+    i = np.repeat(order, per_node)
+    ramp = np.arange(per_node.sum()) - np.repeat(np.cumsum(per_node) - per_node, per_node)
+    j = order[np.repeat(starts[cell[order]], per_node) + ramp]
+    keep = i != j
+    return i[keep], j[keep]
+
+
+# x 座標の順位で列に、列の中では y 座標の順位で行に分け、
+# どのセルにもほぼ同じ数のノードが入るようにする（ノードが偏っても遅くならない）
+def _balanced_cells(xy, grid):
+    n = len(xy)
+    col = np.empty(n, dtype=np.int64)
+    col[np.argsort(xy[:, 0], kind="stable")] = np.arange(n) * grid // n
+    order = np.lexsort((xy[:, 1], col))
+    sizes = np.bincount(col, minlength=grid)
+    starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    rank = np.arange(n) - starts[col[order]]
+    row = np.empty(n, dtype=np.int64)
+    row[order] = rank * grid // sizes[col[order]]
+    return col * grid + row
+
+
+# NumPy でベクトル化した力学モデル（Fruchterman–Reingold）。
+# 反発力は、同じセル内のノード同士だけ厳密に計算し、他のセルはセルの重心と
+# ノード数でまとめて近似する（Barnes–Hut と同じ考え方の格子版）。
+def force_layout(G, seed=42, iterations=50):
+    nodes, edges = _node_index(G)
+    n = len(nodes)
+    if n == 0:
+        return {}
+    if n == 1:
+        return {nodes[0]: np.zeros(2)}
+
+    rng = np.random.default_rng(seed)
+    xy = rng.random((n, 2))
+    k = np.sqrt(1.0 / n)
+    # セル数を約 √n にすると、近似計算と厳密計算がどちらも O(n^1.5) に収まる
+    grid = max(1, int(np.ceil(n ** 0.25)))
+    temperature = 0.1
+    cooling = temperature / (iterations + 1)
+    for _ in range(iterations):
+        cell = _balanced_cells(xy, grid)
+        n_cells = grid * grid
+
+        # 遠くのセル: 重心にノード数分の質量があるとみなす
+        mass = np.bincount(cell, minlength=n_cells).astype(float)
+        occupied = mass > 0
+        centroid = np.zeros((n_cells, 2))
+        centroid[:, 0] = np.bincount(cell, weights=xy[:, 0], minlength=n_cells)
+        centroid[:, 1] = np.bincount(cell, weights=xy[:, 1], minlength=n_cells)
+        centroid[occupied] /= mass[occupied, None]
+        cells = np.flatnonzero(occupied)
+        delta = xy[:, None, :] - centroid[None, cells, :]
+        dist2 = np.maximum((delta ** 2).sum(axis=2), 1e-6)
+        weight = mass[cells][None, :] * (k * k) / dist2
+        weight[cell[:, None] == cells[None, :]] = 0.0
+        disp = (delta * weight[:, :, None]).sum(axis=1)
+
+        # 同じセル内: ノード同士で厳密に計算
+        i, j = _within_cell_pairs(cell, n_cells)
+        if len(i):
+            d = xy[i] - xy[j]
+            w = (k * k) / np.maximum((d ** 2).sum(axis=1), 1e-6)
+            disp[:, 0] += np.bincount(i, weights=d[:, 0] * w, minlength=n)
+            disp[:, 1] += np.bincount(i, weights=d[:, 1] * w, minlength=n)
+
+        # 引力（辺でつながったノード同士）
+        if len(edges):
+            d = xy[edges[:, 0]] - xy[edges[:, 1]]
+            dist = np.sqrt(np.maximum((d ** 2).sum(axis=1), 1e-12))
+            f = d * (dist / k)[:, None]
+            for axis in range(2):
+                disp[:, axis] -= np.bincount(edges[:, 0], weights=f[:, axis], minlength=n)
+                disp[:, axis] += np.bincount(edges[:, 1], weights=f[:, axis], minlength=n)
+
+        length = np.sqrt(np.maximum((disp ** 2).sum(axis=1), 1e-12))
+        xy += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    return dict(zip(nodes, _rescale(xy)))
+
+
+# ラプラシアン行列の固有ベクトル（小さい方から2番目・3番目）を座標にする
+def spectral_layout(G, seed=42):
+    nodes, edges = _node_index(G)
+    n = len(nodes)
+    if n <= 2:
+        return nx.spring_layout(G, seed=seed)
+    A = np.zeros((n, n))
+    A[edges[:, 0], edges[:, 1]] = 1.0
+    A = np.maximum(A, A.T)
+    L = np.diag(A.sum(axis=1)) - A
+    _, vectors = np.linalg.eigh(L)
+    return dict(zip(nodes, _rescale(vectors[:, 1:3])))
+
+
+# s→t のネットワーク向け: 出発点からの段数で左から右へ並べる
+def layered_layout(G, source=None, target=None, seed=42):
+    nodes = list(G.nodes)
+    if not nodes:
+        return {}
+    UG = G.to_undirected(as_view=True) if G.is_directed() else G
+    if source not in G:
+        source = nodes[0]
+    layer = dict(nx.single_source_shortest_path_length(UG, source))
+    last = max(layer.values())
+    # 到達できないノードは一番右の次の段にまとめる
+    for n in nodes:
+        if n not in layer:
+            layer[n] = last + 1
+    last = max(layer.values())
+    if target in G and target != source and layer[target] < last:
+        layer[target] = last + 1 if any(layer[n] == last for n in nodes if n != target) else last
+
+    columns = {}
+    for n in nodes:
+        columns.setdefault(layer[n], []).append(n)
+    pos = {}
+    for depth in sorted(columns):
+        # 前の段の隣接ノードの平均の高さで並べ、辺の交差を減らす
+        def barycenter(n):
+            ys = [pos[m][1] for m in nx.all_neighbors(G, n) if m in pos]
+            return sum(ys) / len(ys) if ys else 0.0
+        column = sorted(columns[depth], key=barycenter)
+        for i, n in enumerate(column):
+            y = 0.0 if len(column) == 1 else 1.0 - 2.0 * i / (len(column) - 1)
+            pos[n] = np.array([float(depth), y])
+    return dict(zip(pos, _rescale(np.array(list(pos.values())))))
+
+
+LAYOUT_ENGINES = {
+    "spring": "標準（spring）",
+    "force": "高速（力学モデル）",
+    "spectral": "スペクトル",
+    "layered": "階層（出発点→終点）",
+}
+
+
+def compute_layout(G, engine="spring", seed=42, source=None, target=None):
+    if engine == "force":
+        return force_layout(G, seed=seed)
+    if engine == "spectral":
+        return spectral_layout(G, seed=seed)
+    if engine == "layered":
+        return layered_layout(G, source=source, target=target, seed=seed)
+    return nx.spring_layout(G, seed=seed)
+
+
+# --- グラフと一緒に配置を保存する（G.graph に入れておき、再実行では計算しない） ---
+# 生成後に変更しないグラフ（ランダム問題など）向け。
+def stored_layout(G, engine="spring", seed=42, source=None, target=None):
+    layouts = G.graph.setdefault("layouts", {})
+    key = (engine, seed) if engine != "layered" else (engine, seed, source, target)
+    if key not in layouts:
+        with span("layout"):
+            layouts[key] = compute_layout(G, engine, seed=seed, source=source, target=target)
+    return layouts[key]
+
+
+def layout_selectbox(key, default="spring"):
+    engines = list(LAYOUT_ENGINES)
+    return st.selectbox("レイアウト", engines, index=engines.index(default),
+                        format_func=LAYOUT_ENGINES.get, key=key)
@@ -0,0 +1,218 @@
+import io
+import math
+import os
+import queue
+import threading
+
+import networkx as nx
+import streamlit as st
+from xml.sax.saxutils import escape
+
+from graph_cache import LRUCache, graph_fingerprint
+from rerun_timing import span
+
+
+# 描画バックエンド: "matplotlib"（サーバーでラスタライズ）/ "svg"（ブラウザでベクター描画）
+# 環境変数 GRAPH_RENDER_BACKEND か、URL の ?render=svg で切り替える
+RENDER_BACKENDS = ("matplotlib", "svg")
+DEFAULT_BACKEND = os.environ.get("GRAPH_RENDER_BACKEND", "matplotlib")
+
+
+# --- 描画結果のキャッシュ（全セッション共通） ---
+# キー: グラフ・配置・強調表示・スタイルから作ったフィンガープリント
+# 値:   エンコード済みの画像バイト列（PNG / SVG）
+figure_cache = LRUCache(max_entries=256, max_bytes=64 * 1024 * 1024)
+
+
+# --- 描画用キャンバスのプール ---
+# pyplot のグローバルな Figure 管理を使わず、Agg の Figure を使い回す。
+# プールに戻せない分は参照が切れた時点で解放されるので、メモリは上限付き。
+# 描画は _render_lock で1つずつ行う（フォントなど matplotlib 内部の共有オブジェクトが
+# スレッドセーフではないため）ので、同時に使うキャンバスは1枚だけ。プールも1枚にしておく。
+class CanvasPool:
+    def __init__(self, size=1):
+        self._pool = queue.LifoQueue(maxsize=size)
+
+    def acquire(self, figsize):
+        try:
+            fig = self._pool.get_nowait()
+        except queue.Empty:
+            # matplotlib は読み込みに時間がかかるので、ラスタ描画が初めて必要になったときに読み込む
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_agg import FigureCanvasAgg
+            fig = Figure()
+            FigureCanvasAgg(fig)
+        fig.set_size_inches(figsize)
+        return fig
+
+    def release(self, fig):
+        fig.clear()
+        try:
+            self._pool.put_nowait(fig)
+        except queue.Full:
+            pass
+
+    def size(self):
+        return self._pool.qsize()
+
+
+canvas_pool = CanvasPool()
+
+# matplotlib の描画処理はスレッドセーフではないため、描画中は排他する
+_render_lock = threading.Lock()
+
+
+def _draw(G, pos, edge_labels, node_color, edge_color, highlight_edges,
+          highlight_color, highlight_width, figsize, fmt):
+    with _render_lock:
+        fig = canvas_pool.acquire(figsize)
+        try:
+            ax = fig.add_subplot()
+            nx.draw(G, pos, with_labels=True, node_color=node_color, edge_color=edge_color,
+                    arrows=G.is_directed(), ax=ax)
+            if edge_labels:
+                nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, ax=ax)
+            if highlight_edges:
+                nx.draw_networkx_edges(G, pos, edgelist=list(highlight_edges), edge_color=highlight_color,
+                                       width=highlight_width, arrows=G.is_directed(), ax=ax)
+            buf = io.BytesIO()
+            fig.savefig(buf, format=fmt, bbox_inches="tight", dpi=200)
+            return buf.getvalue()
+        finally:
+            canvas_pool.release(fig)
+
+
+# --- ブラウザ描画用のシーン記述（ノード・座標・辺ラベル・強調辺） ---
+def graph_scene(G, pos, edge_labels=None, node_color="lightblue", edge_color="gray",
+                highlight_edges=(), highlight_color="red", highlight_width=2):
+    highlight = {tuple(e) for e in highlight_edges}
+    if not G.is_directed():
+        highlight |= {(v, u) for u, v in highlight}
+    edge_labels = edge_labels or {}
+    edges = []
+    for u, v in G.edges:
+        label = edge_labels.get((u, v), edge_labels.get((v, u)) if not G.is_directed() else None)
+        edge = {"u": str(u), "v": str(v)}
+        if label is not None:
+            edge["label"] = str(label)
+        if (u, v) in highlight:
+            edge["hl"] = 1
+        edges.append(edge)
+    return {
+        "directed": G.is_directed(),
+        "nodes": [{"id": str(n), "x": round(float(pos[n][0]), 4), "y": round(float(pos[n][1]), 4)} for n in G.nodes],
+        "edges": edges,
+        "style": {
+            "node": node_color,
+            "edge": edge_color,
+            "hl": highlight_color,
+            "hl_width": highlight_width,
+        },
+    }
+
+
+def scene_to_svg(scene, figsize=(6, 4)):
+    width, height = figsize[0] * 100, figsize[1] * 100
+    margin, radius = 30, 15
+    nodes = scene["nodes"]
+    xs = [n["x"] for n in nodes] or [0]
+    ys = [n["y"] for n in nodes] or [0]
+    span_x = (max(xs) - min(xs)) or 1
+    span_y = (max(ys) - min(ys)) or 1
+
+    # 座標を SVG の画面座標に変換（y 軸は上下反転）
+    def to_screen(node):
+        x = margin + (node["x"] - min(xs)) / span_x * (width - 2 * margin) if len(nodes) > 1 else width / 2
+        y = margin + (max(ys) - node["y"]) / span_y * (height - 2 * margin) if len(nodes) > 1 else height / 2
+        return x, y
+
+    xy = {n["id"]: to_screen(n) for n in nodes}
+    style = scene["style"]
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {width:.0f} {height:.0f}" '
+        f'font-family="sans-serif" font-size="12">',
+    ]
+    if scene["directed"]:
+        out.append(
+            '<defs><marker id="a" viewBox="0 0 10 10" refX="10" refY="5" markerWidth="8" markerHeight="8" '
+            'orient="auto-start-reverse"><path d="M0,0L10,5L0,10z" fill="context-stroke"/></marker></defs>'
+        )
+    labels = []
+    for edge in scene["edges"]:
+        (x1, y1), (x2, y2) = xy[edge["u"]], xy[edge["v"]]
+        length = math.hypot(x2 - x1, y2 - y1) or 1
+        # 矢印がノードの円に隠れないよう、終点側を半径分だけ縮める
+        if scene["directed"]:
+            x2 -= (x2 - x1) / length * radius
+            y2 -= (y2 - y1) / length * radius
+        color, stroke = (style["hl"], style["hl_width"]) if edge.get("hl") else (style["edge"], 1)
+        marker = ' marker-end="url(#a)"' if scene["directed"] else ""
+        out.append(f'<line x1="{x1:.1f}" y1="{y1:.1f}" x2="{x2:.1f}" y2="{y2:.1f}" '
+                   f'stroke="{escape(color)}" stroke-width="{stroke}"{marker}/>')
+        if "label" in edge:
+            mx, my = (xy[edge["u"]][0] + xy[edge["v"]][0]) / 2, (xy[edge["u"]][1] + xy[edge["v"]][1]) / 2
+            labels.append(f'<text x="{mx:.1f}" y="{my:.1f}" text-anchor="middle" dominant-baseline="central" '
+                          f'stroke="white" stroke-width="4" paint-order="stroke">{escape(edge["label"])}</text>')
+    out.extend(labels)
+    for node in nodes:
+        x, y = xy[node["id"]]
+        out.append(f'<circle cx="{x:.1f}" cy="{y:.1f}" r="{radius}" fill="{escape(style["node"])}"/>'
+                   f'<text x="{x:.1f}" y="{y:.1f}" text-anchor="middle" dominant-baseline="central">'
+                   f'{escape(node["id"])}</text>')
+    out.append("</svg>")
+    return "".join(out)
+
+
+def current_backend():
+    try:
+        backend = st.query_params.get("render", DEFAULT_BACKEND)
+    except Exception:
+        backend = DEFAULT_BACKEND
+    return backend if backend in RENDER_BACKENDS else "matplotlib"
+
+
+# --- グラフ画像を返す（同じ内容ならキャッシュ済みのバイト列を返す） ---
+# 描画キャッシュのキー（render_graph と同じ引数で呼ぶ）
+def figure_key(G, pos, edge_labels=None, node_color="lightblue", edge_color="gray",
+               highlight_edges=(), highlight_color="red", highlight_width=2,
+               figsize=(6, 4), fmt="png", backend="matplotlib"):
+    return graph_fingerprint(
+        G, pos,
+        edge_labels=edge_labels or {},
+        style=(node_color, edge_color, highlight_color, highlight_width, tuple(figsize), fmt, backend),
+        highlight=tuple(tuple(e) for e in highlight_edges),
+    )
+
+
+# cache=False のときは描画キャッシュを使わない（作り置きの問題の図など、まだ誰も見ていない図）。
+# prerendered に {キー: バイト列} を渡すと、キーが一致すればその図を使う
+def render_graph(G, pos, edge_labels=None, node_color="lightblue", edge_color="gray",
+                 highlight_edges=(), highlight_color="red", highlight_width=2,
+                 figsize=(6, 4), fmt="png", backend="matplotlib", cache=True, prerendered=None):
+    highlight_edges = tuple(tuple(e) for e in highlight_edges)
+    key = figure_key(G, pos, edge_labels, node_color, edge_color, highlight_edges,
+                     highlight_color, highlight_width, figsize, fmt, backend)
+    data = figure_cache.get(key) if cache else None
+    if data is None and prerendered:
+        data = prerendered.get(key)
+    if data is None:
+        if backend == "svg":
+            scene = graph_scene(G, pos, edge_labels, node_color, edge_color, highlight_edges,
+                                highlight_color, highlight_width)
+            data = scene_to_svg(scene, figsize).encode("utf-8")
+        else:
+            data = _draw(G, pos, edge_labels, node_color, edge_color, highlight_edges,
+                         highlight_color, highlight_width, figsize, fmt)
+    if cache:
+        figure_cache.put(key, data)
+    return data
+
+
+def show_graph(G, pos, backend=None, **kwargs):
+    backend = backend or current_backend()
+    with span("render"):
+        data = render_graph(G, pos, backend=backend, **kwargs)
+        if backend == "svg" or kwargs.get("fmt", "png") == "svg":
+            st.image(data.decode("utf-8"))
+        else:
+            st.image(data)
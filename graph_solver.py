@@ -0,0 +1,236 @@
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+import networkx as nx
+
+from graph_flow import FlowNetwork, solve_max_flow
+from solution_cache import solution_cache
+
+
+# --- 最短経路木（1回の Dijkstra で全ノードへの距離と経路をまとめて持つ） ---
+class ShortestPathTree:
+    def __init__(self, source, dist, pred):
+        self.source = source
+        self.dist = dist
+        self.pred = pred
+
+    def reachable(self, target):
+        return target in self.dist
+
+    def length(self, target):
+        if target not in self.dist:
+            raise nx.NetworkXNoPath(f"Node {target} not reachable from {self.source}")
+        return self.dist[target]
+
+    def path(self, target):
+        if target not in self.dist:
+            raise nx.NetworkXNoPath(f"Node {target} not reachable from {self.source}")
+        # 先行ノードをたどるだけなので、経路の長さに比例する時間で求まる
+        path = [target]
+        while path[-1] != self.source:
+            path.append(self.pred[path[-1]][0])
+        path.reverse()
+        return path
+
+
+def _dijkstra_tree(G, source, weight):
+    pred, dist = nx.dijkstra_predecessor_and_distance(G, source, weight=weight)
+    return ShortestPathTree(source, dist, pred)
+
+
+def _encode_tree(tree, index):
+    dist = {index[v]: d for v, d in tree.dist.items()}
+    pred = {index[v]: tuple(index[u] for u in us) for v, us in tree.pred.items()}
+    return index[tree.source], dist, pred
+
+
+def _decode_tree(value, order):
+    source, dist, pred = value
+    return ShortestPathTree(order[source], {order[i]: d for i, d in dist.items()},
+                            {order[i]: [order[j] for j in js] for i, js in pred.items()})
+
+
+# (グラフ, 出発点, 重み属性) ごとに全セッションで共有（solution_cache.py）。
+# 返す木はキャッシュと共有のことがあるので、書き換えないこと
+def shortest_path_tree(G, source, weight="weight"):
+    if source not in G:
+        raise nx.NodeNotFound(f"Source {source} is not in G")
+    return solution_cache.lookup("shortest_path", G, weight, (source,),
+                                 lambda: _dijkstra_tree(G, source, weight), _encode_tree, _decode_tree)
+
+
+def solve_shortest_path(G, source, target, weight="weight"):
+    tree = shortest_path_tree(G, source, weight=weight)
+    return tree.path(target), tree.length(target)
+
+
+# --- 辺の追加に合わせて最短経路木を更新する（自作グラフ向け） ---
+# 問い合わせのあった出発点ごとに最短経路木を持っておき、辺が追加された・
+# 重みが減ったときは、その辺から距離が縮むノードだけを Dijkstra と同じ順に
+# 更新する（距離が変わらないノードには触らない）。重みが増えたときや、
+# 別のグラフが渡されたときは木を捨てて、次の問い合わせで作り直す。
+# 辺の追加は必ず add_edge() を通すこと（G.add_edge() を直接呼ぶと木が古いままになる）。
+class DynamicShortestPaths:
+    def __init__(self, weight="weight"):
+        self.weight = weight
+        self.trees = {}
+        self._graph = None
+        self.rebuilds = 0
+        self.updated_nodes = 0
+
+    def _sync(self, G):
+        if G is not self._graph:
+            self.trees.clear()
+            self._graph = G
+
+    def add_edge(self, G, u, v, weight):
+        self._sync(G)
+        old = G[u][v][self.weight] if G.has_edge(u, v) else None
+        G.add_edge(u, v, **{self.weight: weight})
+        if old is not None and weight > old:
+            self.trees.clear()
+            return
+        if u == v or (old is not None and weight == old):
+            return
+        for tree in self.trees.values():
+            self.updated_nodes += _decrease_from(G, tree, u, v, weight, self.weight)
+            if not G.is_directed():
+                self.updated_nodes += _decrease_from(G, tree, v, u, weight, self.weight)
+
+    def tree(self, G, source):
+        self._sync(G)
+        if source not in G:
+            raise nx.NodeNotFound(f"Source {source} is not in G")
+        tree = self.trees.get(source)
+        if tree is None:
+            # 共有キャッシュの木をコピーしてから持つ（辺の追加で書き換えるため）
+            shared = shortest_path_tree(G, source, weight=self.weight)
+            tree = ShortestPathTree(source, dict(shared.dist), {v: list(us) for v, us in shared.pred.items()})
+            self.trees[source] = tree
+            self.rebuilds += 1
+        return tree
+
+    def shortest_path(self, G, source, target):
+        tree = self.tree(G, source)
+        return tree.path(target), tree.length(target)
+
+
+# 辺 a→b（重み w）が追加された・軽くなったときに、距離が縮むノードへ順に伝える。
+# 更新したノードの数を返す
+def _decrease_from(G, tree, a, b, w, weight):
+    dist, pred = tree.dist, tree.pred
+    if a not in dist:
+        return 0
+    d = dist[a] + w
+    if b in dist and d >= dist[b]:
+        if d == dist[b] and a not in pred[b]:
+            pred[b].append(a)
+        return 0
+    dist[b] = d
+    pred[b] = [a]
+    heap = [(d, 0, b)]
+    count = 1
+    updated = 0
+    while heap:
+        d, _, x = heapq.heappop(heap)
+        if d > dist[x]:
+            continue
+        updated += 1
+        for y, data in G[x].items():
+            nd = d + data[weight]
+            if y not in dist or nd < dist[y]:
+                dist[y] = nd
+                pred[y] = [x]
+                heapq.heappush(heap, (nd, count, y))
+                count += 1
+            elif nd == dist[y] and x not in pred[y]:
+                pred[y].append(x)
+    return updated
+
+
+# --- 全ての (出発点, 到達点) の答えをグラフ生成時にまとめて計算する ---
+# 計算はバックグラウンドのスレッドで行い、結果（Future）を G.graph["answers"] に保存する。
+# 以降の操作では、できあがった表を引くだけになる。
+_answer_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="answers")
+
+
+def all_pairs_shortest_paths(G, weight="weight"):
+    return {source: shortest_path_tree(G, source, weight=weight) for source in G}
+
+
+def _encode_flow_table(table, index):
+    encoded = {}
+    for (s, t), (has_path, value, flow) in table.items():
+        if flow is not None:
+            flow = {(index[u], index[v]): f for u, row in flow.items() for v, f in row.items()}
+        encoded[(index[s], index[t])] = (has_path, value, flow)
+    return encoded
+
+
+def _decode_flow_table(encoded, order):
+    table = {}
+    for (i, j), (has_path, value, edges) in encoded.items():
+        flow = None
+        if edges is not None:
+            flow = {u: {} for u in order}
+            for (a, b), f in edges.items():
+                flow[order[a]][order[b]] = f
+        table[(order[i], order[j])] = (has_path, value, flow)
+    return table
+
+
+# 全ての組の表をまとめて全セッションで共有する（同じ形のランダム問題なら計算しない）
+def all_pairs_max_flow(G, capacity="capacity"):
+    return solution_cache.lookup("all_pairs_max_flow", G, capacity, (),
+                                 lambda: _all_pairs_max_flow(G, capacity), _encode_flow_table, _decode_flow_table)
+
+
+def _all_pairs_max_flow(G, capacity):
+    # 残余ネットワークの配列は1回だけ組み立て、組ごとに使い回す
+    network = FlowNetwork(G, capacity)
+    table = {}
+    for source in G:
+        reachable = nx.descendants(G, source)
+        for target in G:
+            if target == source:
+                continue
+            if target in reachable:
+                result = network.solve(source, target)
+                table[(source, target)] = (True, result.flow_value, result.flow_dict())
+            else:
+                table[(source, target)] = (False, 0, None)
+    return table
+
+
+_ANSWER_BUILDERS = {
+    "shortest_path": all_pairs_shortest_paths,
+    "max_flow": all_pairs_max_flow,
+}
+
+
+def precompute_answers(G, kind):
+    # 計算中にグラフが書き換わっても影響しないよう、コピーを渡す。付随データ（答え・レイアウトなど）は
+    # 渡さないが、ArrayGraph から計算済みのフィンガープリントは残す（solution_cache を引くたびに
+    # グラフ全体を数え直さずに済む）
+    H = G.copy()
+    H.graph = {key: G.graph[key] for key in ("frozen_fingerprint",) if key in G.graph}
+    G.graph["answers"] = _answer_executor.submit(_ANSWER_BUILDERS[kind], H)
+
+
+def shortest_path_answer(G, source, target, weight="weight"):
+    future = G.graph.get("answers")
+    if future is None:
+        return solve_shortest_path(G, source, target, weight=weight)
+    tree = future.result()[source]
+    return tree.path(target), tree.length(target)
+
+
+# 戻り値: (経路があるか, 最大流量, 辺ごとの流量)
+def max_flow_answer(G, source, target, capacity="capacity"):
+    future = G.graph.get("answers")
+    if future is not None:
+        return future.result()[(source, target)]
+    if not nx.has_path(G, source, target):
+        return False, 0, None
+    result = solve_max_flow(G, source, target, capacity=capacity)
+    return True, result.flow_value, result.flow_dict()
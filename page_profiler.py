@@ -0,0 +1,161 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+# --- ページ全体のプロファイル（どのページでも、ページ側の変更なしで使える） ---
+# 環境変数 GRAPH_PROFILE=1 で起動すると有効になる。URL の ?profile=1 は、GRAPH_PROFILE_ALLOW=1 で
+# 起動したときだけ受け付ける（だれでも付けられるので、ふだんは無視する）。
+# show_sidebar() の中から今のページのスクリプトをもう一度 cProfile の下で実行し、
+# 終わったら元の実行は st.stop() で止める（画面に出るのはプロファイル下の実行の結果）。
+# 同時に、実行中のスタックを一定間隔で記録するサンプリングも行い、
+#   <ページ名>-<日時>.prof       … cProfile の結果（python -m pstats や snakeviz で開ける）
+#   <ページ名>-<日時>.collapsed  … flamegraph.pl / speedscope にそのまま渡せる折りたたみスタック
+# を GRAPH_PROFILE_DIR（既定は profiles/）に書き出す。残すのは新しいほうから GRAPH_PROFILE_KEEP 回分
+# （既定は 20）で、それより古いものは書き出すたびに消す。
+# フラグメントだけの再実行は show_sidebar() を通らないので対象外。
+PROFILE_DIR = os.environ.get(
+    "GRAPH_PROFILE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "profiles"))
+PROFILE_ALWAYS = os.environ.get("GRAPH_PROFILE", "").lower() in ("1", "true")
+PROFILE_ALLOW = os.environ.get("GRAPH_PROFILE_ALLOW", "").lower() in ("1", "true")
+PROFILE_KEEP = int(os.environ.get("GRAPH_PROFILE_KEEP", "20"))
+PROFILE_SUFFIXES = (".prof", ".collapsed")
+SAMPLE_INTERVAL = 0.005
+
+_local = threading.local()
+_save_lock = threading.Lock()
+
+
+def profile_requested():
+    if PROFILE_ALWAYS:
+        return True
+    return PROFILE_ALLOW and st.query_params.get("profile", "").lower() in ("1", "true")
+
+
+# 一定間隔で対象スレッドのスタックを記録する（stop_code の関数より内側だけを残す）
+class StackSampler:
+    def __init__(self, thread_id, stop_code, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.stop_code = stop_code
+        self.interval = interval
+        self.stacks = Counter()
+        self._done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="page-profiler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._done.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._done.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None and frame.f_code is not self.stop_code:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            # ページの実行の外（開始前・終了後）のサンプルは捨てる
+            if frame is not None and stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def collapsed(self):
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+def _script_path(ctx):
+    page = ctx.pages_manager.get_pages().get(ctx.page_script_hash)
+    return page["script_path"] if page else ctx.main_script_path
+
+
+def _run_script(path):
+    with open(path, encoding="utf-8") as f:
+        code = compile(f.read(), path, "exec")
+    exec(code, {"__name__": "__main__", "__file__": path})
+
+
+def top_functions(profile, limit=15):
+    # [(関数, 呼び出し回数, 自身の時間[ms], 累積時間[ms])]（自身の時間の長い順）
+    stats = pstats.Stats(profile)
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        rows.append((f"{name} ({os.path.basename(filename)}:{line})", calls, tottime * 1000, cumtime * 1000))
+    rows.sort(key=lambda row: row[2], reverse=True)
+    return rows[:limit]
+
+
+# show_sidebar() の最初に呼ぶ。プロファイルしないときは何もせずに戻る
+def profile_page():
+    ctx = get_script_run_ctx()
+    if ctx is None or getattr(_local, "active", False) or not profile_requested():
+        return
+    path = _script_path(ctx)
+    profile = cProfile.Profile()
+    sampler = StackSampler(threading.get_ident(), _run_script.__code__)
+    _local.active = True
+    start = time.perf_counter()
+    sampler.start()
+    profile.enable()
+    try:
+        _run_script(path)
+    finally:
+        profile.disable()
+        sampler.stop()
+        _local.active = False
+        elapsed = time.perf_counter() - start
+        prefix = _save(path, profile, sampler)
+    _show(profile, sampler, elapsed, prefix)
+    st.stop()
+
+
+def _save(path, profile, sampler):
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S") + f"-{int(time.time() * 1000) % 1000:03d}"
+    prefix = os.path.join(PROFILE_DIR, f"{os.path.splitext(os.path.basename(path))[0]}-{stamp}")
+    with _save_lock:
+        profile.dump_stats(prefix + ".prof")
+        with open(prefix + ".collapsed", "w", encoding="utf-8") as f:
+            f.write(sampler.collapsed())
+        _remove_old(PROFILE_KEEP)
+    return prefix
+
+
+def _remove_old(keep):
+    # 書き出した時刻の新しい順に keep 回分（.prof と .collapsed の組）を残す
+    runs = {}
+    for name in os.listdir(PROFILE_DIR):
+        stem, ext = os.path.splitext(name)
+        if ext in PROFILE_SUFFIXES:
+            path = os.path.join(PROFILE_DIR, name)
+            try:
+                runs[stem] = max(runs.get(stem, 0.0), os.path.getmtime(path))
+            except OSError:
+                pass
+    for stem in sorted(runs, key=runs.get, reverse=True)[max(keep, 1):]:
+        for ext in PROFILE_SUFFIXES:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, stem + ext))
+            except OSError:
+                pass
+
+
+def _show(profile, sampler, elapsed, prefix):
+    with st.expander(f"🔬 プロファイル結果（{elapsed * 1000:.0f} ms）", expanded=True):
+        lines = ["| 関数 | 呼び出し | 自身 (ms) | 累積 (ms) |", "|---|---:|---:|---:|"]
+        for name, calls, own, total in top_functions(profile):
+            lines.append(f"| `{name}` | {calls} | {own:.1f} | {total:.1f} |")
+        st.markdown("\n".join(lines))
+        st.caption(f"保存先: {prefix}.prof / .collapsed（サンプル {sum(sampler.stacks.values())} 件）")
+        buf = io.StringIO()
+        pstats.Stats(profile, stream=buf).sort_stats("cumulative").print_stats(30)
+        st.code(buf.getvalue(), language="text")
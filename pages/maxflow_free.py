@@ -1,7 +1,12 @@
 import streamlit as st
 import networkx as nx
-import matplotlib.pyplot as plt
 from sidebar_common import show_sidebar 
+from graph_render import show_graph
+from graph_flow import IncrementalMaxFlow
+from graph_layout import session_layout
+from graph_generator import node_label
+from graph_io import graph_io_panel
+from rerun_timing import span
 
 st.set_page_config(page_title="最大流問題（自作）")
 
@@ -18,59 +23,9 @@ show_sidebar()
 st.title("🔵 最大流問題（自作）")
 st.markdown("ノードと容量付きの有向辺を追加して、自分だけのネットワークを作ってみよう！")
 
-# --- 初期化 ---
-if "digraph_mf" not in st.session_state:
-    st.session_state.digraph_mf = nx.DiGraph()
-if "node_counter_mf" not in st.session_state:
-    st.session_state.node_counter_mf = 0
-
-G = st.session_state.digraph_mf
-
-# --- 1. ノード追加ボタン（常に表示） ---
-add_node_clicked = st.button("＋ ノードを追加")
-if add_node_clicked:
-    if st.session_state.node_counter_mf < 26:
-        node_name = chr(65 + st.session_state.node_counter_mf)
-        if node_name not in G:
-            G.add_node(node_name)
-            st.session_state.node_counter_mf += 1
-            st.success(f"ノード「{node_name}」を追加しました。")
-        else:
-            st.warning(f"ノード「{node_name}」はすでに存在しています。")
-    else:
-        st.error("Zまで追加済みです。これ以上のノードは追加できません。")
-
-# --- 2. グラフ描画（ノードが1つ以上あるとき） ---
-if len(G.nodes) >= 1:
-    st.markdown("#### 🗺️ 現在のグラフ")
-    pos = nx.spring_layout(G, seed=42)
-    plt.figure(figsize=(6, 4))
-    nx.draw(G, pos, with_labels=True, node_color='lightyellow', edge_color='gray', arrows=True)
-    edge_labels = {(u, v): f"{d['capacity']}" for u, v, d in G.edges(data=True)}
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
-    st.pyplot(plt)
-
-# --- 3. 辺追加フォーム（ノードが2つ以上のとき） ---
-if len(G.nodes) >= 2:
-    st.markdown("#### ➕ 有向辺（容量付き）を追加")
-    with st.form("add_edge_form_mf"):
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            node1 = st.selectbox("始点ノード", list(G.nodes), key="maxflowfree_e1")
-        with col2:
-            node2 = st.selectbox("終点ノード", list(G.nodes), key="maxflowfree_e2")
-        with col3:
-            capacity = st.number_input("容量（flow capacity）", min_value=1, value=1, step=1, key="maxflowfree_cap")
-        submitted = st.form_submit_button("有向辺を追加")
-        if submitted:
-            G.add_edge(node1, node2, capacity=capacity)
-            st.success(f"辺 {node1} → {node2}（容量: {capacity}）を追加しました。")
-            st.rerun()
-
-
-
-# --- 解答クイズ形式 ---
-if len(G.nodes) >= 2 and len(G.edges) > 0:
+# --- 最大流クイズ（出発点・終点の選択と解答） ---
+@st.fragment
+def maxflowfree_quiz(G, pos):
     if "maxflow_quiz_answered" not in st.session_state:
         st.session_state.maxflow_quiz_answered = False
 
@@ -97,7 +52,12 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
         user_flow = st.session_state.maxflowfree_user_flow
         if source != target:
             try:
-                flow_value, flow_dict = nx.maximum_flow(G, source, target, capacity="capacity")
+                # 前回の流れを覚えておき、辺を足しただけなら増えた分だけ計算する
+                if "maxflowfree_flows" not in st.session_state:
+                    st.session_state.maxflowfree_flows = IncrementalMaxFlow()
+                with span("solve"):
+                    result = st.session_state.maxflowfree_flows.solve(G, source, target)
+                    flow_value, flow_dict = result.flow_value, result.flow_dict()
                 # 正誤判定
                 if user_flow == flow_value:
                     st.success("正解です！🎉")
@@ -107,11 +67,8 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
                 st.info(f"【最大流の流量】{flow_value}")
 
                 # グラフ描画（最大流をラベルで表示）
-                plt.figure(figsize=(6, 4))
-                nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='gray', arrows=True)
                 edge_labels = {(u, v): f"{flow_dict[u][v]}/{G[u][v]['capacity']}" for u, v in G.edges}
-                nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
-                st.pyplot(plt)
+                show_graph(G, pos, edge_labels=edge_labels, node_color='lightblue')
 
             except nx.NetworkXError as e:
                 st.error(f"エラーが発生しました: {e}")
@@ -140,8 +97,68 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
         if st.button("問題を作り直す"):
             st.session_state.digraph_mf = nx.DiGraph()
             st.session_state.node_counter_mf = 0
+            st.session_state.pop("layout_mf", None)
             for k in list(st.session_state.keys()):
                 if k.startswith("maxflowfree_"):
                     del st.session_state[k]
-            st.info("ノード・辺が全てリセットされました。新たにグラフを作成してください。")
+            # クイズの部分だけでなくページ全体を実行し直して、新しい（空の）グラフで描き直す
+            st.rerun()
 
+
+# --- 初期化 ---
+if "digraph_mf" not in st.session_state:
+    st.session_state.digraph_mf = nx.DiGraph()
+if "node_counter_mf" not in st.session_state:
+    st.session_state.node_counter_mf = 0
+
+G = st.session_state.digraph_mf
+
+# --- 1. ノード追加ボタン（常に表示） ---
+add_node_clicked = st.button("＋ ノードを追加")
+if add_node_clicked:
+    # A, B, ..., Z の次は AA, AB, ...（読み込んだグラフで使われている名前は飛ばす）
+    while node_label(st.session_state.node_counter_mf) in G:
+        st.session_state.node_counter_mf += 1
+    node_name = node_label(st.session_state.node_counter_mf)
+    G.add_node(node_name)
+    st.session_state.node_counter_mf += 1
+    st.success(f"ノード「{node_name}」を追加しました。")
+
+# --- 2. グラフ描画（ノードが1つ以上あるとき） ---
+if len(G.nodes) >= 1:
+    st.markdown("#### 🗺️ 現在のグラフ")
+    relayout = st.button("🔄 配置を整える", key="maxflowfree_relayout")
+    pos = session_layout(G, "layout_mf", full=relayout)
+    edge_labels = {(u, v): f"{d['capacity']}" for u, v, d in G.edges(data=True)}
+    show_graph(G, pos, edge_labels=edge_labels, node_color='lightyellow')
+
+# --- 3. 辺追加フォーム（ノードが2つ以上のとき） ---
+if len(G.nodes) >= 2:
+    st.markdown("#### ➕ 有向辺（容量付き）を追加")
+    with st.form("add_edge_form_mf"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            node1 = st.selectbox("始点ノード", list(G.nodes), key="maxflowfree_e1")
+        with col2:
+            node2 = st.selectbox("終点ノード", list(G.nodes), key="maxflowfree_e2")
+        with col3:
+            capacity = st.number_input("容量（flow capacity）", min_value=1, value=1, step=1, key="maxflowfree_cap")
+        submitted = st.form_submit_button("有向辺を追加")
+        if submitted:
+            G.add_edge(node1, node2, capacity=capacity)
+            st.success(f"辺 {node1} → {node2}（容量: {capacity}）を追加しました。")
+            st.rerun()
+
+# --- まとめて読み込み・書き出し（1回の再実行でグラフ全体を差し替える） ---
+new_graph = graph_io_panel(G, "maxflowfree_io", "max_flow", attr="capacity", cast=int)
+if new_graph is not None:
+    st.session_state.digraph_mf = new_graph
+    st.session_state.pop("layout_mf", None)
+    st.rerun()
+
+
+
+# --- 解答クイズ形式 ---
+if len(G.nodes) >= 2 and len(G.edges) > 0:
+    # クイズ部分だけを再実行の単位にする（予想の入力や解答ではグラフを描き直さない）
+    maxflowfree_quiz(G, pos)
@@ -1,9 +1,11 @@
 import streamlit as st
-import networkx as nx
-import matplotlib.pyplot as plt
-import pandas as pd
-import random
 from sidebar_common import show_sidebar
+from graph_render import show_graph
+from graph_layout import layout_selectbox, stored_layout
+from graph_solver import max_flow_answer
+from rerun_timing import span
+from puzzle_pool import puzzle_pool
+from puzzle_search import LEVELS
 
 st.set_page_config(page_title="最大流問題（ランダム）")
 
@@ -22,6 +24,11 @@ st.markdown("\u30ce\u30fc\u30c9\u6570\u3092\u5165\u529b\u3057\u3066\u3001\u30e9\
 
 # --- ノード数の設定 ---
 num_nodes = st.number_input("ノード数（5〜12）を入力", min_value=5, max_value=12, value=6, step=1)
+# 難しさを選ぶと、ボトルネックが2本以上の辺にまたがり、その難しさになる出発点・終点のある問題を出す
+level = st.selectbox("問題の難しさ", [None, *LEVELS],
+                     format_func=lambda v: "おまかせ（ランダム）" if v is None else LEVELS[v])
+# 選ばれたノード数の問題を裏で作り置きしておく
+puzzle_pool.warm("max_flow", num_nodes, level)
 
 # --- セッション初期化 ---
 if "random_digraph" not in st.session_state:
@@ -34,79 +41,45 @@ if "random_digraph" not in st.session_state:
     st.session_state.graph_message_shown = False
 
 if st.button("グラフを生成する"):
-    nodes = [chr(65 + i) for i in range(num_nodes)]
-    UG = nx.Graph()
-    UG.add_nodes_from(nodes)
-
-    # 最小全域木で連結グラフを構成（無向）
-    available = [nodes[0]]
-    remaining = nodes[1:]
-    while remaining:
-        u = random.choice(available)
-        v = remaining.pop(0)
-        w = random.randint(5, 20)
-        UG.add_edge(u, v, capacity=w)
-        available.append(v)
-
-    # ランダムに辺を追加
-    extra_edges = random.randint(num_nodes // 2, num_nodes)
-    for _ in range(extra_edges):
-        u, v = random.sample(nodes, 2)
-        if not UG.has_edge(u, v):
-            w = random.randint(5, 20)
-            UG.add_edge(u, v, capacity=w)
-
-    # 無向グラフを有向グラフに変換（ランダムな向きに）
-    DG = nx.DiGraph()
-    for u, v, data in UG.edges(data=True):
-        if random.random() < 0.5:
-            DG.add_edge(u, v, capacity=data['capacity'])
-        else:
-            DG.add_edge(v, u, capacity=data['capacity'])
-
-    st.session_state.random_digraph = DG
+    # 作り置きの問題（グラフ・配置・全ての組の答え・描画済み）を取り出す
+    # セッションには配列形式で保存し、表示のたびに networkx へ変換する
+    st.session_state.random_digraph = puzzle_pool.take("max_flow", num_nodes, level)
+    # 難しさを選んで作った問題は、探索で見つけた組を最初から選んでおく
+    puzzle = st.session_state.random_digraph.graph.get("puzzle")
+    if puzzle:
+        st.session_state.source_select = puzzle["source"]
+        st.session_state.target_select = puzzle["target"]
     st.session_state.graph_generated = True
     st.session_state.graph_message_shown = True
     st.rerun()
 
 
-# --- メッセージ・グラフ表示（グラフ生成後は常に表示） ---
-if st.session_state.graph_generated:
-    DG = st.session_state.random_digraph
+# --- 出発点・終点の選択と解答 ---
+@st.fragment
+def random_maxflow_quiz(DG, pos, engine, layout_pair):
     nodes = list(DG.nodes)
 
-    if st.session_state.graph_message_shown:
-        st.success("グラフが生成されました！出発点と終点を選択してください。")
-
+    puzzle = DG.graph.get("puzzle")
+    if puzzle:
+        st.caption(f"おすすめの組（{LEVELS[puzzle['level']]}）: {puzzle['source']} → {puzzle['target']}")
     source = st.selectbox("出発点（source）を選択", nodes, key="source_select")
     target = st.selectbox("終点（sink）を選択", nodes, key="target_select")
 
-    # 🔽 終点選択の直後に表示されるように、ここに警告を入れる
-    if source == target:
-        st.warning("⚠️ 出発点と終点は異なるノードを選んでください。")
-    elif not nx.has_path(DG, source, target):
-        st.error("選択したノード間にパスが存在しません。他のノードを選んでください。")
-
-
-    pos = nx.spring_layout(DG, seed=42)
-    fig, ax = plt.subplots(figsize=(8, 6))
-    nx.draw(DG, pos, with_labels=True, node_color='lightyellow', edge_color='gray', arrows=True, ax=ax)
-    edge_labels = {(u, v): f"{d['capacity']}" for u, v, d in DG.edges(data=True)}
-    nx.draw_networkx_edge_labels(DG, pos, edge_labels=edge_labels, ax=ax)
-    st.pyplot(fig)
+    # 階層レイアウトは出発点・終点で配置が変わるので、そのときだけページ全体を描き直す
+    if engine == "layered" and (source, target) != layout_pair:
+        st.rerun()
 
-    edge_data = [(u, v, d['capacity']) for u, v, d in DG.edges(data=True)]
-    df_edges = pd.DataFrame(edge_data, columns=["始点", "終点", "容量"])
-    st.markdown("### グラフの辺と容量一覧")
-    st.dataframe(df_edges)
+    if source != target:
+        with span("solve"):
+            has_path, flow_value, flow_dict = max_flow_answer(DG, source, target)
 
+    # 🔽 終点選択の直後に表示されるように、ここに警告を入れる
     if source == target:
-        pass
-    elif not nx.has_path(DG, source, target):
+        st.warning("⚠️ 出発点と終点は異なるノードを選んでください。")
+    elif not has_path:
         st.error("選択したノード間にパスが存在しません。他のノードを選んでください。")
     else:
-        # 最大流計算
-        flow_value, flow_dict = nx.maximum_flow(DG, source, target, capacity="capacity")
+        # 最大流（生成時に計算済みの表から取り出す）
         st.session_state.flow_value = flow_value
         st.session_state.flow_dict = flow_dict
         st.session_state.source = source
@@ -126,11 +99,8 @@ if st.session_state.graph_generated:
             st.info(f"【最大流の流量】{correct}")
 
             # グラフ再描画
-            fig2, ax2 = plt.subplots(figsize=(8, 6))
-            nx.draw(DG, pos, with_labels=True, node_color='lightblue', edge_color='gray', arrows=True, ax=ax2)
             flow_labels = {(u, v): f"{flow_dict[u][v]}/{DG[u][v]['capacity']}" for u, v in DG.edges()}
-            nx.draw_networkx_edge_labels(DG, pos, edge_labels=flow_labels, ax=ax2)
-            st.pyplot(fig2)
+            show_graph(DG, pos, edge_labels=flow_labels, node_color='lightblue', figsize=(8, 6))
 
 
 
@@ -143,8 +113,29 @@ if st.session_state.graph_generated:
             st.rerun()
 
 
-            # テーブル表示
-            edge_data = [(u, v, d['capacity']) for u, v, d in DG.edges(data=True)]
-            df_edges = pd.DataFrame(edge_data, columns=["始点", "終点", "容量"])
-            st.markdown("### グラフの辺と容量一覧")
-            st.dataframe(df_edges)
+# --- メッセージ・グラフ表示（グラフ生成後は常に表示） ---
+if st.session_state.graph_generated:
+    DG = st.session_state.random_digraph.to_networkx()
+
+    if st.session_state.graph_message_shown:
+        st.success("グラフが生成されました！出発点と終点を選択してください。")
+
+    engine = layout_selectbox("random_layout_engine")
+    layout_pair = (st.session_state.get("source_select"), st.session_state.get("target_select"))
+    pos = stored_layout(DG, engine, source=layout_pair[0], target=layout_pair[1])
+
+    edge_labels = {(u, v): f"{d['capacity']}" for u, v, d in DG.edges(data=True)}
+    # 作り置きの問題には描画済みの図がついている（最初の表示で使い、セッションには残さない）
+    show_graph(DG, pos, edge_labels=edge_labels, node_color='lightyellow', figsize=(8, 6),
+               prerendered=DG.graph.pop("figure", None))
+
+    with span("table"):
+        edge_data = [(u, v, d['capacity']) for u, v, d in DG.edges(data=True)]
+        import pandas as pd  # 表を出すときだけ読み込む（起動を軽くするため）
+        df_edges = pd.DataFrame(edge_data, columns=["始点", "終点", "容量"])
+        st.markdown("### グラフの辺と容量一覧")
+        st.dataframe(df_edges)
+
+    # クイズ部分だけを再実行の単位にする（出発点・終点の選択や予想の入力では、
+    # グラフの描画や辺の一覧は作り直さない）。問題（グラフ・辺の一覧）のあとに出す
+    random_maxflow_quiz(DG, pos, engine, layout_pair)
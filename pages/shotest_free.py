@@ -1,7 +1,12 @@
 import streamlit as st
 import networkx as nx
-import matplotlib.pyplot as plt
 from sidebar_common import show_sidebar 
+from graph_render import show_graph
+from graph_solver import DynamicShortestPaths
+from graph_layout import session_layout
+from graph_generator import node_label
+from graph_io import graph_io_panel
+from rerun_timing import span
 
 
 
@@ -23,61 +28,9 @@ st.title("🔵 最短経路問題（自作）")
 st.markdown("ノードと辺を自由に追加して、自分だけのグラフを作ろう！")
 
 
-# --- 初期化 ---
-if "graph_sp" not in st.session_state:
-    st.session_state.graph_sp = nx.Graph()
-if "node_counter_sp" not in st.session_state:
-    st.session_state.node_counter_sp = 0
-if "show_edge_form_sp" not in st.session_state:
-    st.session_state.show_edge_form_sp = False  # ← 辺追加フォーム表示フラグ
-
-G = st.session_state.graph_sp
-
-# --- ノード追加 ---
-if st.button("＋ ノードを追加"):
-    if st.session_state.node_counter_sp < 26:
-        node_name = chr(65 + st.session_state.node_counter_sp)
-        if node_name not in G:
-            G.add_node(node_name)
-            st.session_state.node_counter_sp += 1
-            st.success(f"ノード「{node_name}」を追加しました。")
-            if len(G.nodes) >= 2:
-                st.session_state.show_edge_form_sp = True  # ノードが2個以上なら辺追加フォーム解禁
-        else:
-            st.warning(f"ノード「{node_name}」はすでに存在しています。")
-    else:
-        st.error("Zまで追加済みです。これ以上のノードは追加できません。")
-
-# --- グラフ描画（ノードが1つ以上あれば表示）---
-if len(G.nodes) >= 1:
-    pos = nx.spring_layout(G, seed=42)
-    fig, ax = plt.subplots(figsize=(6, 4))
-    nx.draw(G, pos, with_labels=True, node_color='lightgreen', edge_color='gray', ax=ax)
-    edge_labels = {(u, v): f"{d['weight']:.0f}" for u, v, d in G.edges(data=True)}
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, ax=ax)
-    st.pyplot(fig)
-
-# --- 辺追加フォーム（ノードが2個以上 & フラグがTrueの場合）---
-if st.session_state.show_edge_form_sp and len(G.nodes) >= 2:
-    st.markdown("#### ➕ 辺を追加")
-    with st.form("add_edge_form_shortestfree"):
-        col1, col2, col3 = st.columns(3)
-        with col1:
-            node1 = st.selectbox("始点ノード", list(G.nodes), key="shortestfree_e1")
-        with col2:
-            node2 = st.selectbox("終点ノード", list(G.nodes), key="shortestfree_e2")
-        with col3:
-            weight = st.number_input("距離（重み）", min_value=1.0, value=1.0, step=1.0, key="shortestfree_weight")
-        submitted = st.form_submit_button("辺を追加")
-        if submitted:
-            G.add_edge(node1, node2, weight=weight)
-            st.success(f"辺 {node1} ↔ {node2}（重み: {weight}）を追加しました。")
-            st.rerun()  # ← 追加した辺を即座にグラフへ反映
-
-
-
-# --- 最短経路クイズ ---
-if len(G.nodes) >= 2 and len(G.edges) > 0:
+# --- 最短経路クイズ（出発点・到達点の選択と解答） ---
+@st.fragment
+def shortestfree_quiz(G, pos):
     quiz_answered_key = "shortestfree_quiz_answered"
     src_key = "shortestfree_quiz_src"
     tgt_key = "shortestfree_quiz_tgt"
@@ -109,8 +62,8 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
         user_length = st.session_state[userlen_key]
         if source != target:
             try:
-                path = nx.shortest_path(G, source=source, target=target, weight="weight")
-                length = nx.shortest_path_length(G, source=source, target=target, weight="weight")
+                with span("solve"):
+                    path, length = st.session_state.shortestfree_paths.shortest_path(G, source, target)
                 # 正誤判定
                 if user_length == length:
                     st.success("正解です！🎉")
@@ -120,12 +73,9 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
                 st.info(f"【最短経路】{' → '.join(path)}")
 
                 # グラフ描画（最短経路を赤で表示）
-                plt.figure(figsize=(6, 4))
-                nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='gray')
-                nx.draw_networkx_edge_labels(G, pos, edge_labels={(u, v): d['weight'] for u, v, d in G.edges(data=True)})
                 path_edges = list(zip(path[:-1], path[1:]))
-                nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='red', width=2)
-                st.pyplot(plt)
+                show_graph(G, pos, edge_labels={(u, v): d['weight'] for u, v, d in G.edges(data=True)},
+                           node_color='lightblue', highlight_edges=path_edges)
             except nx.NetworkXNoPath:
                 st.error("選択されたノード間に経路がありません。")
         else:
@@ -143,7 +93,73 @@ if len(G.nodes) >= 2 and len(G.edges) > 0:
             if st.button("問題を作り直す"):
                 st.session_state.graph_sp = nx.Graph()
                 st.session_state.node_counter_sp = 0
+                st.session_state.pop("layout_sp", None)
                 for k in list(st.session_state.keys()):
                     if k.startswith("shortestfree_"):
                         del st.session_state[k]
                 st.rerun()
+
+
+# --- 初期化 ---
+if "graph_sp" not in st.session_state:
+    st.session_state.graph_sp = nx.Graph()
+if "node_counter_sp" not in st.session_state:
+    st.session_state.node_counter_sp = 0
+if "show_edge_form_sp" not in st.session_state:
+    st.session_state.show_edge_form_sp = False  # ← 辺追加フォーム表示フラグ
+if "shortestfree_paths" not in st.session_state:
+    # 問い合わせた出発点の最短経路木を持ち、辺の追加では変わった分だけ更新する
+    st.session_state.shortestfree_paths = DynamicShortestPaths()
+
+G = st.session_state.graph_sp
+
+# --- ノード追加 ---
+if st.button("＋ ノードを追加"):
+    # A, B, ..., Z の次は AA, AB, ...（読み込んだグラフで使われている名前は飛ばす）
+    while node_label(st.session_state.node_counter_sp) in G:
+        st.session_state.node_counter_sp += 1
+    node_name = node_label(st.session_state.node_counter_sp)
+    G.add_node(node_name)
+    st.session_state.node_counter_sp += 1
+    st.success(f"ノード「{node_name}」を追加しました。")
+    if len(G.nodes) >= 2:
+        st.session_state.show_edge_form_sp = True  # ノードが2個以上なら辺追加フォーム解禁
+
+# --- グラフ描画（ノードが1つ以上あれば表示）---
+if len(G.nodes) >= 1:
+    relayout = st.button("🔄 配置を整える", key="shortestfree_relayout")
+    pos = session_layout(G, "layout_sp", full=relayout)
+    edge_labels = {(u, v): f"{d['weight']:.0f}" for u, v, d in G.edges(data=True)}
+    show_graph(G, pos, edge_labels=edge_labels, node_color='lightgreen')
+
+# --- 辺追加フォーム（ノードが2個以上 & フラグがTrueの場合）---
+if st.session_state.show_edge_form_sp and len(G.nodes) >= 2:
+    st.markdown("#### ➕ 辺を追加")
+    with st.form("add_edge_form_shortestfree"):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            node1 = st.selectbox("始点ノード", list(G.nodes), key="shortestfree_e1")
+        with col2:
+            node2 = st.selectbox("終点ノード", list(G.nodes), key="shortestfree_e2")
+        with col3:
+            weight = st.number_input("距離（重み）", min_value=1.0, value=1.0, step=1.0, key="shortestfree_weight")
+        submitted = st.form_submit_button("辺を追加")
+        if submitted:
+            st.session_state.shortestfree_paths.add_edge(G, node1, node2, weight)
+            st.success(f"辺 {node1} ↔ {node2}（重み: {weight}）を追加しました。")
+            st.rerun()  # ← 追加した辺を即座にグラフへ反映
+
+# --- まとめて読み込み・書き出し（1回の再実行でグラフ全体を差し替える） ---
+new_graph = graph_io_panel(G, "shortestfree_io", "shortest_path", attr="weight", cast=float)
+if new_graph is not None:
+    st.session_state.graph_sp = new_graph
+    st.session_state.show_edge_form_sp = len(new_graph.nodes) >= 2
+    st.session_state.pop("layout_sp", None)
+    st.rerun()
+
+
+
+# --- 最短経路クイズ ---
+if len(G.nodes) >= 2 and len(G.edges) > 0:
+    # クイズ部分だけを再実行の単位にする（予想の入力や解答ではグラフを描き直さない）
+    shortestfree_quiz(G, pos)
@@ -1,9 +1,12 @@
 import streamlit as st
 import networkx as nx
-import matplotlib.pyplot as plt
-import random
 from sidebar_common import show_sidebar
-import pandas as pd
+from graph_render import show_graph
+from graph_solver import shortest_path_answer
+from graph_layout import layout_selectbox, stored_layout
+from puzzle_pool import puzzle_pool
+from puzzle_search import LEVELS
+from rerun_timing import span
 
 
 st.set_page_config(page_title="最短経路問題（ランダム）")
@@ -23,6 +26,11 @@ st.markdown("ノード数を入力して、ランダム生成されたグラフ
 
 # --- ノード数の設定（スライダーからテキスト入力へ変更） ---
 num_nodes = st.number_input("ノード数（5〜26）を入力", min_value=5, max_value=26, value=6, step=1)
+# 難しさを選ぶと、最短経路が1本に決まり、その難しさになる出発点・到達点のある問題を出す
+level = st.selectbox("問題の難しさ", [None, *LEVELS],
+                     format_func=lambda v: "おまかせ（ランダム）" if v is None else LEVELS[v])
+# 選ばれたノード数の問題を裏で作り置きしておく
+puzzle_pool.warm("shortest_path", num_nodes, level)
 
 # --- セッション初期化 ---
 if "random_graph" not in st.session_state:
@@ -32,53 +40,27 @@ if "random_graph" not in st.session_state:
     st.session_state.graph_generated = False
 
 if st.button("グラフを生成する") or not st.session_state.graph_generated:
-    G = nx.Graph()
-    nodes = [chr(65 + i) for i in range(num_nodes)]
-    G.add_nodes_from(nodes)
-
-    # 最小全域木で連結グラフを構成
-    edges = []
-    available = [nodes[0]]
-    remaining = nodes[1:]
-    while remaining:
-        u = random.choice(available)
-        v = remaining.pop(0)
-        w = random.randint(5, 99)
-        edges.append((u, v, w))
-        available.append(v)
-
-    # ランダムに追加の辺を加える
-    extra_edges = random.randint(num_nodes // 2, num_nodes)
-    for _ in range(extra_edges):
-        u, v = random.sample(nodes, 2)
-        if not G.has_edge(u, v):
-            w = random.randint(5, 99)
-            edges.append((u, v, w))
-
-    G.add_weighted_edges_from(edges)
-
-    st.session_state.random_graph = G
+    # 作り置きの問題（グラフ・配置・全ての組の答え・描画済み）を取り出す
+    # セッションには配列形式で保存し、表示のたびに networkx へ変換する
+    st.session_state.random_graph = puzzle_pool.take("shortest_path", num_nodes, level)
     st.session_state.graph_generated = True
 
-# --- 表示部分 ---
-if st.session_state.graph_generated:
-    G = st.session_state.random_graph
-    pos = nx.spring_layout(G, seed=42)
-    fig, ax = plt.subplots(figsize=(6, 4))
-    nx.draw(G, pos, with_labels=True, node_color='lightyellow', edge_color='gray', ax=ax)
-    edge_labels = {(u, v): f"{d['weight']}" for u, v, d in G.edges(data=True)}
-    nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels, ax=ax)
-    st.pyplot(fig)
-
+# --- 出発点・到達点の選択と解答 ---
+@st.fragment
+def random_shortest_quiz(G, pos, edge_labels):
     st.markdown("#### 出発点と到達点を選んでください")
     nodes = list(G.nodes)
-    src = st.selectbox("出発点", nodes)
-    tgt = st.selectbox("到達点", nodes, index=1 if len(nodes) > 1 else 0)
+    # 難しさを選んで作った問題は、探索で見つけた組を最初から選んでおく
+    puzzle = G.graph.get("puzzle")
+    if puzzle:
+        st.caption(f"おすすめの組（{LEVELS[puzzle['level']]}）: {puzzle['source']} → {puzzle['target']}")
+    src = st.selectbox("出発点", nodes, index=nodes.index(puzzle["source"]) if puzzle else 0)
+    tgt = st.selectbox("到達点", nodes, index=nodes.index(puzzle["target"]) if puzzle else (1 if len(nodes) > 1 else 0))
 
     if src != tgt:
         try:
-            path = nx.shortest_path(G, source=src, target=tgt, weight="weight")
-            length = nx.shortest_path_length(G, source=src, target=tgt, weight="weight")
+            with span("solve"):
+                path, length = shortest_path_answer(G, src, tgt)
 
             st.session_state.correct_length = length
             st.session_state.path = path
@@ -96,12 +78,8 @@ if st.session_state.graph_generated:
                 st.info(f"【最短経路】 {' → '.join(path)}")
 
                 # 経路表示
-                plt.figure(figsize=(6, 4))
-                nx.draw(G, pos, with_labels=True, node_color='lightblue', edge_color='gray')
-                nx.draw_networkx_edge_labels(G, pos, edge_labels=edge_labels)
                 path_edges = list(zip(path[:-1], path[1:]))
-                nx.draw_networkx_edges(G, pos, edgelist=path_edges, edge_color='red', width=2)
-                st.pyplot(plt)
+                show_graph(G, pos, edge_labels=edge_labels, node_color='lightblue', highlight_edges=path_edges)
 
                 st.markdown("---")
                 if st.button("もう一度挑戦する"):
@@ -114,8 +92,24 @@ if st.session_state.graph_generated:
     else:
         st.warning("出発点と到達点は異なるノードを選んでください。")
 
+
+# --- 表示部分 ---
+if st.session_state.graph_generated:
+    G = st.session_state.random_graph.to_networkx()
+    engine = layout_selectbox("random_layout_engine")
+    pos = stored_layout(G, engine)
+    edge_labels = {(u, v): f"{d['weight']}" for u, v, d in G.edges(data=True)}
+    # 作り置きの問題には描画済みの図がついている（最初の表示で使い、セッションには残さない）
+    show_graph(G, pos, edge_labels=edge_labels, node_color='lightyellow', prerendered=G.graph.pop("figure", None))
+
+    # クイズ部分だけを再実行の単位にする（出発点・到達点の選択や予想の入力では、
+    # グラフの描画や辺の一覧は作り直さない）
+    random_shortest_quiz(G, pos, edge_labels)
+
     # 辺と重みの一覧を表示
-    edge_data = [(u, v, d['weight']) for u, v, d in G.edges(data=True)]
-    df_edges = pd.DataFrame(edge_data, columns=["ノードA", "ノードB", "距離（重み）"])
-    st.markdown("### グラフの辺と距離一覧")
-    st.dataframe(df_edges)
+    with span("table"):
+        edge_data = [(u, v, d['weight']) for u, v, d in G.edges(data=True)]
+        import pandas as pd  # 表を出すときだけ読み込む（起動を軽くするため）
+        df_edges = pd.DataFrame(edge_data, columns=["ノードA", "ノードB", "距離（重み）"])
+        st.markdown("### グラフの辺と距離一覧")
+        st.dataframe(df_edges)
@@ -0,0 +1,91 @@
+import time
+
+import streamlit as st
+import networkx as nx
+from sidebar_common import show_sidebar
+from road_network import ROAD_INDEX_DIR, load_road_index
+from rerun_timing import span
+
+
+st.set_page_config(page_title="最短経路問題（道路網）")
+
+st.markdown("""
+    <style>
+    [data-testid="stSidebarNav"] ul {
+        display: none;
+    }
+    </style>
+    """, unsafe_allow_html=True)
+
+show_sidebar()
+
+st.title("🟣 最短経路問題（秋田の道路網）")
+st.markdown("本物の道路網の上で、2つの市のあいだの最短距離を予想してみよう！")
+
+
+# --- 出発地・目的地の選択と解答 ---
+@st.fragment
+def road_quiz(index):
+    places = sorted(index.places)
+    with st.form("road_quiz_form"):
+        col1, col2, col3 = st.columns([1, 1, 1.2])
+        with col1:
+            source = st.selectbox("出発地", places, index=places.index("Senboku") if "Senboku" in places else 0,
+                                  key="road_src")
+        with col2:
+            target = st.selectbox("目的地", places, index=places.index("Akita") if "Akita" in places else 1,
+                                  key="road_tgt")
+        with col3:
+            user_km = st.number_input("最短距離（予想, km）", min_value=0, step=1, key="road_user_km")
+        submitted = st.form_submit_button("解答")
+        if submitted:
+            st.session_state.road_answered = (source, target)
+
+    if "road_answered" not in st.session_state:
+        st.info("出発地・目的地を選び、道のりで何 km あるかを予想して『解答』ボタンを押してください。")
+        return
+
+    source, target = st.session_state.road_answered
+    if source == target:
+        st.warning("出発地と目的地は異なる地点を選んでください。")
+        return
+    try:
+        start = time.perf_counter()
+        with span("solve"):
+            route = index.shortest_path(source, target)
+        elapsed = time.perf_counter() - start
+    except nx.NetworkXNoPath:
+        st.error("選択された地点のあいだに道がつながっていません。")
+        return
+
+    km = route.length / 1000
+    # 道路網の距離は整数にならないので、1割以内の誤差なら正解とする
+    if abs(st.session_state.road_user_km - km) <= km * 0.1:
+        st.success(f"正解です！🎉 最短距離は {km:.1f} km です。")
+    else:
+        st.error(f"不正解です。 正解: {km:.1f} km")
+    st.caption(f"探索したノード数: {route.settled:,} / {index.graph.number_of_nodes():,}"
+               f"（計算時間 {elapsed * 1000:.0f} ms）")
+
+    points = route.latlon()
+    if points:
+        import pandas as pd  # 地図を出すときだけ読み込む（起動を軽くするため）
+        st.map(pd.DataFrame(points, columns=["lat", "lon"]), size=20)
+
+
+# --- 道路網の索引（最初に使われたときに読み込み、全セッションで共有） ---
+index = load_road_index()
+if index is None:
+    st.info("道路網の索引がまだ作られていません。次のコマンドで作成してから、ページを開き直してください。")
+    st.code("python tools/build_road_index.py --edges 辺リスト.txt --nodes ノード座標.txt\n"
+            "# 動作確認だけなら: python tools/build_road_index.py --synthetic 100000", language="bash")
+    st.caption(f"出力先: {ROAD_INDEX_DIR}")
+elif not index.places:
+    # 索引はあるが、ノードの座標（--nodes）なしで作られたので、地点名がノードに割り当てられていない
+    st.warning("道路網の索引はありますが、地点（市）の一覧がありません。"
+               "ノードの座標を指定して索引を作り直してから、ページを開き直してください。")
+    st.code("python tools/build_road_index.py --edges 辺リスト.txt --nodes ノード座標.txt", language="bash")
+    st.caption(f"索引: {ROAD_INDEX_DIR}（ノード {index.graph.number_of_nodes():,} 個・道 {index.graph.number_of_edges():,} 本）")
+else:
+    st.markdown(f"道路網: ノード {index.graph.number_of_nodes():,} 個・道 {index.graph.number_of_edges():,} 本")
+    road_quiz(index)
@@ -0,0 +1,89 @@
+import os
+import threading
+import time
+
+import streamlit as st
+
+
+# --- 重いモジュールの事前読み込み（プロセスごとに1回だけ） ---
+# 最初にホームが開かれたとき（ふつうは授業前に先生が開いたとき）に、
+# バックグラウンドのスレッドで networkx・matplotlib・pandas と求解・描画のモジュールを読み込み、
+# 小さなグラフを1回解いて描いておく（フォントの読み込みなど初回だけの処理を済ませる）。
+# ホームやサイドバーは待たずにすぐ表示され、生徒が各ページを開くころには準備が終わっている。
+# 環境変数 GRAPH_PREWARM=0 で無効にできる。
+PREWARM_ENABLED = os.environ.get("GRAPH_PREWARM", "1").lower() not in ("0", "false")
+
+
+# ページを実行中のスレッドがなくなるまで（最大 timeout 秒）待つ（生徒の表示と CPU を取り合わない）
+def wait_until_idle(timeout):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline and any(
+            t.name.startswith("ScriptRunner.") for t in threading.enumerate()):
+        time.sleep(0.05)
+
+
+class Warmup:
+    def __init__(self, idle_wait=10.0):
+        self.idle_wait = idle_wait
+        self.timings = {}
+        self.done = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="prewarm", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _step(self, name, func):
+        wait_until_idle(self.idle_wait)
+        start = time.perf_counter()
+        try:
+            func()
+        except Exception:
+            # 事前読み込みに失敗しても、各ページが必要になったときに読み込み直すだけ
+            pass
+        self.timings[name] = time.perf_counter() - start
+
+    def _run(self):
+        self._step("networkx", lambda: __import__("networkx"))
+        self._step("matplotlib", lambda: __import__("matplotlib.backends.backend_agg"))
+        self._step("pandas", lambda: __import__("pandas"))
+        self._step("modules", _import_app_modules)
+        self._step("solve_render", _solve_and_render_small_graph)
+        self.done.set()
+
+
+def _import_app_modules():
+    import graph_flow  # noqa: F401
+    import graph_io  # noqa: F401
+    import graph_layout  # noqa: F401
+    import graph_solver  # noqa: F401
+    import puzzle_pool  # noqa: F401  読み込むだけ（作り置きはページの warm() で始まる）
+
+
+def _solve_and_render_small_graph():
+    import networkx as nx
+    from graph_flow import solve_max_flow
+    from graph_render import render_graph
+    from graph_solver import solve_shortest_path
+
+    edges = [("A", "B", 3), ("B", "C", 2), ("A", "C", 6)]
+    D = nx.DiGraph()
+    D.add_weighted_edges_from(edges, weight="capacity")
+    solve_max_flow(D, "A", "C")
+    G = nx.Graph()
+    G.add_weighted_edges_from(edges)
+    solve_shortest_path(G, "A", "C")
+    pos = {"A": (0.0, 0.0), "B": (1.0, 1.0), "C": (2.0, 0.0)}
+    render_graph(G, pos, edge_labels={(u, v): w for u, v, w in edges})
+
+
+@st.cache_resource(show_spinner=False)
+def _start_warmup():
+    return Warmup().start()
+
+
+# Home.py から呼ぶ（2回目以降はキャッシュ済みの Warmup を返すだけ）
+def prewarm():
+    if not PREWARM_ENABLED:
+        return None
+    return _start_warmup()
@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import deque
+
+from graph_generator import random_connected_graph
+from graph_layout import stored_layout
+from graph_render import figure_key, render_graph
+from graph_solver import precompute_answers
+from prewarm import wait_until_idle
+from puzzle_search import search_puzzle
+
+
+# --- 問題の種類ごとの設定 ---
+# render はランダム問題のページの最初の描画と同じ引数にしておく
+# （そうすると、ページ側で作り置きの図がそのまま使える）
+PUZZLE_KINDS = {
+    "shortest_path": {
+        "generate": {"weight_range": (5, 99)},
+        "render": {"node_color": "lightyellow", "figsize": (6, 4)},
+    },
+    "max_flow": {
+        "generate": {"weight_range": (5, 20), "directed": True, "attr": "capacity"},
+        "render": {"node_color": "lightyellow", "figsize": (8, 6)},
+    },
+}
+
+
+# グラフ生成・レイアウト・全ての組の答え・描画まで済ませた問題を1つ作る
+# level（puzzle_search.LEVELS）を指定すると、答えが1つに決まりその難しさになる組があるグラフを探し、
+# その組を AG.graph["puzzle"] に入れる（None ならこれまでどおりのランダムなグラフ）
+# 図は共有の描画キャッシュには入れず、AG.graph["figure"]（{キー: PNG}）に持たせる。
+# 取り出したページが show_graph(..., prerendered=...) に渡すと、そこで初めて描画キャッシュに入る
+# （まだ誰も見ていない図で、生徒が表示中の図をキャッシュから追い出さない）。
+# idle_wait 秒までは、ページを実行中のスレッドがなくなるのを待ってから描く（描画の排他で待たせない）
+def build_puzzle(kind, num_nodes, level=None, idle_wait=0):
+    spec = PUZZLE_KINDS[kind]
+    if level is None:
+        AG = random_connected_graph(num_nodes, **spec["generate"])
+    else:
+        AG = search_puzzle(kind, num_nodes, level, spec["generate"])
+    G = AG.to_networkx()
+    pos = stored_layout(G, "spring")
+    precompute_answers(G, kind)
+    G.graph["answers"].result()
+    edge_labels = {(u, v): f"{w}" for u, v, w in G.edges(data=AG.attr)}
+    if idle_wait:
+        wait_until_idle(idle_wait)
+    data = render_graph(G, pos, edge_labels=edge_labels, cache=False, **spec["render"])
+    AG.graph["figure"] = {figure_key(G, pos, edge_labels=edge_labels, **spec["render"]): data}
+    return AG
+
+
+# --- 作り置きの問題のプール（プロセス全体で共有） ---
+# (問題の種類, ノード数, 難しさ) ごとに size 個まで作り置きし、減ったら
+# バックグラウンドのスレッドが補充する。take() は取り出すだけなので一瞬で終わる。
+# 作り置きするのは最近 warm() / take() された max_keys 個の組み合わせだけで、
+# ttl 秒使われなかった組み合わせは作り置きごと捨てる（メモリを使い続けない）。
+class PuzzlePool:
+    def __init__(self, size=8, max_keys=8, ttl=600.0, idle_wait=2.0):
+        self.size = size
+        self.max_keys = max_keys
+        self.ttl = ttl
+        self.idle_wait = idle_wait
+        self._pools = {}
+        self._requested = {}
+        self._cond = threading.Condition()
+        self._worker = None
+
+    def _ensure_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="puzzle-pool", daemon=True)
+            self._worker.start()
+
+    def _touch(self, key):
+        # 呼び出し側で self._cond を持っていること
+        self._requested.pop(key, None)
+        self._requested[key] = time.monotonic()
+        self._pools.setdefault(key, deque())
+        # 古い順に、数の上限を超えた分と ttl を過ぎた分を捨てる
+        now = time.monotonic()
+        for old in list(self._requested):
+            if len(self._requested) <= self.max_keys and now - self._requested[old] <= self.ttl:
+                break
+            del self._requested[old]
+            self._pools.pop(old, None)
+
+    def _next_key(self):
+        now = time.monotonic()
+        for key, pool in self._pools.items():
+            if len(pool) < self.size and now - self._requested[key] <= self.ttl:
+                return key
+        return None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                key = self._next_key()
+                while key is None:
+                    self._cond.wait()
+                    key = self._next_key()
+            puzzle = build_puzzle(*key, idle_wait=self.idle_wait)
+            with self._cond:
+                # 作っている間に捨てられた組み合わせの問題は入れない
+                if key in self._pools:
+                    self._pools[key].append(puzzle)
+
+    def warm(self, kind, num_nodes, level=None):
+        # 使われそうなノード数・難しさを登録しておくと、裏で作り置きが始まる
+        with self._cond:
+            self._touch((kind, num_nodes, level))
+            self._ensure_worker()
+            self._cond.notify()
+
+    def take(self, kind, num_nodes, level=None):
+        key = (kind, num_nodes, level)
+        with self._cond:
+            self._touch(key)
+            pool = self._pools[key]
+            puzzle = pool.popleft() if pool else None
+            self._ensure_worker()
+            self._cond.notify()
+        # 作り置きが足りないときはその場で作る
+        return puzzle if puzzle is not None else build_puzzle(kind, num_nodes, level)
+
+    def stats(self):
+        with self._cond:
+            return {"/".join(str(part) for part in key if part is not None): len(pool)
+                    for key, pool in self._pools.items()}
+
+
+puzzle_pool = PuzzlePool()
@@ -0,0 +1,129 @@
+import time
+from collections import deque
+
+import networkx as nx
+import numpy as np
+
+from graph_flow import FlowNetwork
+from graph_generator import random_connected_graph
+
+
+# --- 答えが1つに決まり、難しさをそろえた問題の探索 ---
+# 候補のグラフをまとめて作り（1つの乱数列から batch 個ずつ）、各グラフの全ての (出発点, 終点) を採点して、
+# 条件を満たす組があるグラフだけを残す。条件:
+#   最短経路: 最短経路がちょうど1本（【最短経路】の表示が1通りに決まる）、2本以上の辺を通る
+#             （直接の辺が最短になる問題は出さない）
+#   最大流:   ボトルネック（最小カット）が2本以上の辺にまたがる、流量が 0 でない
+# 難しさ（レベル）は次のように決める:
+#   最短経路: 1 = 2辺、2 = 3辺以上、3 = 4辺以上で、辺の数が最も少ない経路は最短経路ではない（遠回りが正解）
+#   最大流:   1 = カットが2本、2 = カットが3本以上か、出発点・終点のまわり以外にカットの辺がある、
+#             3 = カットが3本以上で、出発点・終点のまわり以外にカットの辺がある
+# 同じグラフでレベルに合う組がいくつもあるときは、その中からランダムに1つ選ぶ（出発点が偏らないように）。
+# budget 秒以内に見つからなければ、条件を満たす組のうち一番近いレベルのもの（それもなければ最後の候補）を返す。
+# 1グラフの採点は数 ms（26ノードの最短経路・12ノードの最大流）なので、プロセスを分けて並列にするより
+# 1つのスレッドで順に採点したほうが速い。ふつうは puzzle_pool の作り置きのスレッドが裏で探しておく。
+LEVELS = {1: "やさしい", 2: "ふつう", 3: "むずかしい"}
+SEARCH_BATCH = 8
+SEARCH_BUDGET = 0.2
+
+
+def _path_counts(pred, dist):
+    # 最短経路の本数（2本以上は2とみなす）。距離の近い順に、先行ノードの本数を足していく
+    counts = {}
+    for v in sorted(dist, key=dist.__getitem__):
+        counts[v] = min(2, sum(counts[u] for u in pred[v])) if pred[v] else 1
+    return counts
+
+
+def shortest_path_levels(G, source, weight="weight"):
+    # 出発点から、条件を満たす各終点へのレベルと辺の数 {終点: (レベル, 辺の数)}
+    pred, dist = nx.dijkstra_predecessor_and_distance(G, source, weight=weight)
+    counts = _path_counts(pred, dist)
+    fewest = nx.single_source_shortest_path_length(G, source)
+    levels = {}
+    for target in dist:
+        if target == source or counts[target] != 1:
+            continue
+        hops = 0
+        v = target
+        while v != source:
+            v = pred[v][0]
+            hops += 1
+        if hops < 2:
+            continue
+        if hops >= 4 and fewest[target] < hops:
+            level = 3
+        elif hops >= 3:
+            level = 2
+        else:
+            level = 1
+        levels[target] = (level, hops)
+    return levels
+
+
+def max_flow_level(network, source, target):
+    result = network.solve(source, target)
+    if result.flow_value == 0:
+        return None
+    # 出発点側に近い最小カットの辺
+    cut = result.cut_edges()
+    if len(cut) < 2:
+        return None
+    # 出発点から出る辺・終点に入る辺だけでできたカットは見つけやすい
+    inner = not (all(u == source for u, _ in cut) or all(v == target for _, v in cut))
+    if len(cut) >= 3 and inner:
+        level = 3
+    elif len(cut) >= 3 or inner:
+        level = 2
+    else:
+        level = 1
+    return level, len(cut)
+
+
+def score_candidate(kind, AG, level):
+    # 条件を満たす組のうち、レベルとの差が最も小さいものを全て返す
+    # 戻り値: (レベルとの差, [(出発点, 終点, 達したレベル, 辺の数 / カットの本数), ...])。なければ None
+    G = AG.to_networkx()
+    scored = []
+    if kind == "shortest_path":
+        for source in G:
+            for target, (got, size) in shortest_path_levels(G, source, AG.attr).items():
+                scored.append((source, target, got, size))
+    else:
+        network = FlowNetwork(G, AG.attr)
+        for source in G:
+            for target in nx.descendants(G, source):
+                result = max_flow_level(network, source, target)
+                if result is not None:
+                    scored.append((source, target) + result)
+    if not scored:
+        return None
+    gap = min(abs(got - level) for _, _, got, _ in scored)
+    return gap, [pair for pair in scored if abs(pair[2] - level) == gap]
+
+
+def search_puzzle(kind, num_nodes, level, generate, batch=SEARCH_BATCH, budget=SEARCH_BUDGET, seed=None):
+    # generate は random_connected_graph に渡す引数（puzzle_pool.PUZZLE_KINDS の "generate"）。
+    # 見つけた組は AG.graph["puzzle"] に入れて返す
+    rng = np.random.default_rng(seed)
+    deadline = time.perf_counter() + budget
+    best = None
+    candidates = deque()
+    while True:
+        if not candidates:
+            # 候補をまとめて作っておき、順に採点する
+            seeds = rng.integers(0, 2**63 - 1, size=batch)
+            candidates.extend(random_connected_graph(num_nodes, seed=int(s), **generate) for s in seeds)
+        AG = candidates.popleft()
+        scored = score_candidate(kind, AG, level)
+        if scored is not None and (best is None or scored[0] < best[1][0]):
+            best = (AG, scored)
+        if (best is not None and best[1][0] == 0) or time.perf_counter() > deadline:
+            break
+    if best is None:
+        # 条件を満たす組が1つもなかった（とても小さなグラフなど）: ふつうのランダム問題として出す
+        return AG
+    AG, (gap, pairs) = best
+    source, target, got, size = pairs[rng.integers(len(pairs))]
+    AG.graph["puzzle"] = {"source": source, "target": target, "level": got, "size": size, "matched": gap == 0}
+    return AG
@@ -0,0 +1,136 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+
+# --- 再実行ごとの処理時間の計測 ---
+# with span("solve"): ... のように囲んだ区間の時間を、セッションごとに記録する。
+#   ・URL に ?debug=timing をつけると、サイドバーに処理時間のパネルを出す
+#   ・環境変数 GRAPH_TIMING_LOG にファイル名を指定すると、区間ごとに1行の JSONL で追記する
+#     （集計は python tools/timing_report.py ログ.jsonl で、段階ごとの p50 / p95 を出す）
+# サイドバーのパネルは再実行の最初に描くので、表示されるのは「前回の再実行」の内訳と、
+# このセッションでのこれまでの p50 / p95（フラグメントだけの再実行の分も含む）。
+# フラグメントだけの再実行では start_rerun が呼ばれないので、その再実行で最初に記録するときに
+# 新しい記録を始める（前の再実行の記録に混ざらないように）。1回の記録は MAX_SPANS 区間まで。
+# Streamlit の外（バックグラウンドのスレッドなど）から呼ばれたときは何もしない。
+TIMING_LOG = os.environ.get("GRAPH_TIMING_LOG")
+DEBUG_VALUES = ("1", "true", "timing")
+MAX_SPANS = 256
+
+_log_lock = threading.Lock()
+
+
+class RerunTrace:
+    def __init__(self, page, run=None):
+        self.page = page
+        # 再実行の目印（フラグメントだけの再実行では、実行するフラグメントの一覧。再実行ごとに別のリスト）
+        self.run = run
+        self.started = time.time()
+        self.spans = []
+
+    @property
+    def fragment(self):
+        return bool(self.run)
+
+    def totals(self):
+        totals = {}
+        for stage, seconds in self.spans:
+            totals[stage] = totals.get(stage, 0.0) + seconds
+        return totals
+
+
+def debug_enabled():
+    return st.query_params.get("debug", "").lower() in DEBUG_VALUES
+
+
+def _current_page(ctx):
+    page = ctx.pages_manager.get_pages().get(ctx.page_script_hash)
+    return os.path.basename(page["script_path"]) if page else "?"
+
+
+# show_sidebar() から、各ページの再実行の最初に呼ぶ
+def start_rerun():
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None
+    page = _current_page(ctx)
+    history = st.session_state.setdefault("_timing_history", deque(maxlen=200))
+    if debug_enabled():
+        last = next((past for past in reversed(history) if past.page == page), None)
+        if last is not None:
+            _show_panel(last, history)
+    return _open_trace(page, ctx.fragment_ids_this_run, history)
+
+
+def _open_trace(page, run, history):
+    trace = RerunTrace(page, run)
+    st.session_state["_timing_trace"] = trace
+    history.append(trace)
+    return trace
+
+
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(stage, time.perf_counter() - start)
+
+
+def _record(stage, seconds):
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return
+    trace = st.session_state.get("_timing_trace")
+    if trace is None:
+        return
+    if ctx.fragment_ids_this_run and trace.run is not ctx.fragment_ids_this_run:
+        # フラグメントだけの再実行の最初の区間
+        trace = _open_trace(trace.page, ctx.fragment_ids_this_run, st.session_state["_timing_history"])
+    if len(trace.spans) < MAX_SPANS:
+        trace.spans.append((stage, seconds))
+    if TIMING_LOG:
+        entry = {"ts": round(time.time(), 3), "session": ctx.session_id, "page": trace.page,
+                 "stage": stage, "ms": round(seconds * 1000, 3),
+                 "fragment": bool(ctx.fragment_ids_this_run)}
+        with _log_lock, open(TIMING_LOG, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    k = (len(values) - 1) * q / 100
+    lo = int(k)
+    hi = min(lo + 1, len(values) - 1)
+    return values[lo] + (values[hi] - values[lo]) * (k - lo)
+
+
+def summarize(samples):
+    # {段階: [秒, ...]} → [(段階, 回数, p50[ms], p95[ms])]
+    return [(stage, len(values), percentile(values, 50) * 1000, percentile(values, 95) * 1000)
+            for stage, values in sorted(samples.items())]
+
+
+def _show_panel(trace, history):
+    samples = {}
+    for past in history:
+        if past.page == trace.page:
+            for stage, seconds in past.totals().items():
+                samples.setdefault(stage, []).append(seconds)
+    lines = ["| 段階 | 前回 (ms) | p50 | p95 | 回数 |", "|---|---:|---:|---:|---:|"]
+    last = trace.totals()
+    for stage, count, p50, p95 in summarize(samples):
+        previous = f"{last[stage] * 1000:.1f}" if stage in last else "-"
+        lines.append(f"| {stage} | {previous} | {p50:.1f} | {p95:.1f} | {count} |")
+    kind = "フラグメントのみ" if trace.fragment else "ページ全体"
+    st.sidebar.markdown(f"#### ⏱️ 処理時間（{trace.page}・前回は{kind}）")
+    st.sidebar.markdown("\n".join(lines))
@@ -0,0 +1,219 @@
+import heapq
+import json
+import math
+import os
+import threading
+import time
+
+import networkx as nx
+import numpy as np
+
+from graph_array import ArrayGraph
+
+
+# インデックスの置き場所（tools/build_road_index.py の出力先）
+ROAD_INDEX_DIR = os.environ.get(
+    "ROAD_INDEX_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "road_akita"))
+
+# 秋田県内の主な地点（緯度, 経度）。座標つきの道路網では最寄りのノードに割り当てる
+AKITA_PLACES = {
+    "Akita": (39.7200, 140.1025),
+    "Noshiro": (40.2119, 140.0270),
+    "Odate": (40.2714, 140.5644),
+    "Kazuno": (40.2158, 140.7883),
+    "Kitaakita": (40.2262, 140.3706),
+    "Oga": (39.8869, 139.8475),
+    "Katagami": (39.8833, 140.0497),
+    "Yurihonjo": (39.3858, 140.0489),
+    "Nikaho": (39.2031, 139.9078),
+    "Daisen": (39.4531, 140.4756),
+    "Senboku": (39.7003, 140.7311),
+    "Yokote": (39.3114, 140.5533),
+    "Yuzawa": (39.1642, 140.4950),
+}
+
+
+# --- ALT（ランドマークと三角不等式を使う A*）の索引つき道路網 ---
+# ランドマーク l から全ノードへの距離 d_l をあらかじめ求めておくと、
+# 三角不等式から |d_l(t) - d_l(v)| ≤ dist(v, t) が成り立つので、これを A* の
+# 見積もりに使える。見積もりが正確なほど、探索するノードが目的地の方向に絞られる。
+# 配列はすべてメモリマップで読むので、10万ノード規模でも読み込みは一瞬で終わる。
+class RoadIndex:
+    def __init__(self, graph, landmarks, coords=None, places=None):
+        self.graph = graph
+        self.landmarks = landmarks
+        self.coords = coords
+        self.places = places or {}
+
+    @classmethod
+    def load(cls, directory, mmap_mode="r"):
+        graph = ArrayGraph.load(directory, mmap_mode=mmap_mode)
+        landmarks = np.load(os.path.join(directory, "landmarks.npy"), mmap_mode=mmap_mode)
+        coords_path = os.path.join(directory, "coords.npy")
+        coords = np.load(coords_path, mmap_mode=mmap_mode) if os.path.exists(coords_path) else None
+        places = {}
+        places_path = os.path.join(directory, "places.json")
+        if os.path.exists(places_path):
+            with open(places_path, encoding="utf-8") as f:
+                places = json.load(f)
+        return cls(graph, landmarks, coords, places)
+
+    def save(self, directory):
+        self.graph.save(directory)
+        np.save(os.path.join(directory, "landmarks.npy"), self.landmarks)
+        if self.coords is not None:
+            np.save(os.path.join(directory, "coords.npy"), self.coords)
+        with open(os.path.join(directory, "places.json"), "w", encoding="utf-8") as f:
+            json.dump(self.places, f, ensure_ascii=False)
+
+    def node(self, name):
+        # 地点名か、元データのノード ID で指定する
+        if name in self.places:
+            return self.places[name]
+        return self.graph.index(name)
+
+    def shortest_path(self, source, target):
+        s, t = self.node(source), self.node(target)
+        path, length, settled = alt_search(self.graph, self.landmarks, s, t)
+        return RoadRoute(self, path, length, settled)
+
+
+class RoadRoute:
+    def __init__(self, index, path, length, settled):
+        self.index = index
+        self.path = path
+        self.length = length
+        self.settled = settled
+
+    def latlon(self, max_points=2000):
+        # 地図に描くための座標（点が多すぎるときは間引く）
+        if self.index.coords is None:
+            return []
+        step = max(1, math.ceil(len(self.path) / max_points))
+        points = self.path[::step]
+        if points[-1] != self.path[-1]:
+            points.append(self.path[-1])
+        return self.index.coords[points].tolist()
+
+
+def alt_search(graph, landmarks, s, t):
+    # 戻り値: (ノード番号の経路, 長さ, 確定したノード数)
+    indptr, indices, values = graph.indptr, graph.indices, graph.values
+    target_row = np.asarray(landmarks[t])
+    dist = {s: 0.0}
+    parent = {s: -1}
+    done = set()
+    heap = [(float(np.abs(landmarks[s] - target_row).max()), s)]
+    while heap:
+        _, u = heapq.heappop(heap)
+        if u in done:
+            continue
+        done.add(u)
+        if u == t:
+            break
+        a, b = indptr[u:u + 2].tolist()
+        neighbors = indices[a:b]
+        # 隣接ノードの見積もりをまとめて計算する
+        estimates = np.abs(landmarks[neighbors] - target_row).max(axis=1)
+        du = dist[u]
+        for v, w, h in zip(neighbors.tolist(), values[a:b].tolist(), estimates.tolist()):
+            nd = du + w
+            if nd < dist.get(v, math.inf):
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(heap, (nd + h, v))
+    if t not in done:
+        raise nx.NetworkXNoPath(f"Node {graph.labels[t]} not reachable from {graph.labels[s]}")
+    path = [t]
+    while path[-1] != s:
+        path.append(parent[path[-1]])
+    path.reverse()
+    return path, dist[t], len(done)
+
+
+# --- 索引の作成（tools/build_road_index.py から使う） ---
+def _dijkstra_all(n, indptr, indices, values, s):
+    # 1つの出発点から全ノードへの距離（Python のリストの上で計算する）
+    dist = [math.inf] * n
+    dist[s] = 0.0
+    heap = [(0.0, s)]
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for a in range(indptr[u], indptr[u + 1]):
+            v = indices[a]
+            nd = d + values[a]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist
+
+
+def choose_landmarks(graph, k=16, seed=0, log=None):
+    # 「既に選んだランドマークから最も遠いノード」を順に選ぶ（farthest 法）
+    n = graph.number_of_nodes()
+    indptr, indices, values = graph.indptr.tolist(), graph.indices.tolist(), graph.values.tolist()
+    rng = np.random.default_rng(seed)
+    start = _dijkstra_all(n, indptr, indices, values, int(rng.integers(n)))
+    nearest = np.asarray(start)
+    chosen, rows = [], []
+    for i in range(min(k, n)):
+        begin = time.perf_counter()
+        node = int(np.argmax(np.where(np.isfinite(nearest), nearest, -1.0)))
+        row = np.asarray(_dijkstra_all(n, indptr, indices, values, node))
+        chosen.append(node)
+        rows.append(row)
+        nearest = row if i == 0 else np.minimum(nearest, row)
+        if log:
+            log(f"landmark {i + 1}/{k}: node {graph.labels[node]} ({time.perf_counter() - begin:.2f}s)")
+    return chosen, np.ascontiguousarray(np.stack(rows, axis=1))
+
+
+def largest_component(labels, src, dst, lengths):
+    # 道路データは小さな孤立部分を含むことが多いので、最大の連結成分だけを残す
+    n = len(labels)
+    parent = list(range(n))
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in zip(src.tolist(), dst.tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[ru] = rv
+    roots = np.array([find(x) for x in range(n)])
+    keep = roots == np.bincount(roots).argmax()
+    new_id = np.cumsum(keep) - 1
+    edge_keep = keep[src] & keep[dst]
+    labels = [label for label, k in zip(labels, keep.tolist()) if k]
+    return labels, new_id[src[edge_keep]], new_id[dst[edge_keep]], lengths[edge_keep], keep
+
+
+def nearest_nodes(coords, places):
+    # 地点ごとに、直線距離で最も近いノード（緯度・経度の簡易的な距離で十分）
+    lat, lon = coords[:, 0], coords[:, 1]
+    scale = math.cos(math.radians(float(np.mean(lat))))
+    result = {}
+    for name, (plat, plon) in places.items():
+        d2 = (lat - plat) ** 2 + ((lon - plon) * scale) ** 2
+        result[name] = int(np.argmin(d2))
+    return result
+
+
+# --- 読み込み（最初に使われたときに1回だけ。全セッションで共有） ---
+_indexes = {}
+_load_lock = threading.Lock()
+
+
+def load_road_index(directory=None):
+    directory = directory or ROAD_INDEX_DIR
+    with _load_lock:
+        if directory not in _indexes:
+            if not os.path.exists(os.path.join(directory, "landmarks.npy")):
+                return None
+            _indexes[directory] = RoadIndex.load(directory)
+        return _indexes[directory]
@@ -1,6 +1,11 @@
 import streamlit as st
+from rerun_timing import start_rerun
+from page_profiler import profile_page
 
 def show_sidebar():
+    # ?profile=1 のときは、このページをプロファイラの下で実行し直す
+    profile_page()
+
     st.sidebar.title("🔗 メニュー")
 
     # ✅ Home に戻るリンク
@@ -18,3 +23,10 @@ def show_sidebar():
     st.sidebar.markdown("## 🟡 ランダム問題")
     st.sidebar.page_link("pages/shotest_random.py", label="最短経路問題（ランダム）")
     st.sidebar.page_link("pages/maxflow_random.py", label="最大流問題（ランダム）")
+
+    st.sidebar.markdown("---")
+    st.sidebar.markdown("## 🟣 道路網")
+    st.sidebar.page_link("pages/shotest_road.py", label="最短経路問題（秋田の道路網）")
+
+    # 再実行ごとの処理時間の記録を始める（?debug=timing のときはサイドバーに表示）
+    start_rerun()
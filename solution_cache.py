@@ -0,0 +1,173 @@
+import hashlib
+import sys
+
+from graph_cache import LRUCache, _canonical, graph_fingerprint
+
+
+# --- 全セッション共通の解のキャッシュ ---
+# 最短経路・最大流の答えを、グラフの中身（辺・重み/容量）と出発点・終点から作ったキーで共有する。
+#   ・小さなグラフ（CANONICAL_MAX_NODES 以下）は、ノード名の付け方によらない「標準形」のキーを使う。
+#     名前だけが違う同じ形のグラフ（同型なグラフ）を別の生徒が作っても、1回解けば済む。
+#     答えは標準形の番号で持ち、取り出すときに呼び出し側のノード名に戻す。
+#   ・大きなグラフや、対称性が高く標準形を作るのに手間がかかりすぎるグラフは、
+#     ノード名込みのフィンガープリント（graph_fingerprint）をキーにする。
+# 最短経路の同じ長さの経路が複数あるときは、そのうちのどれかを返す（どれも正しい答え）。
+# 全ての組の最大流の表（12ノードで 100 KB ほど）や道路網の最短経路木は大きいので、件数だけでなく
+# おおよそのバイト数（approx_size）でも上限をつける。
+CANONICAL_MAX_NODES = 26
+MAX_LEAVES = 16
+MAX_BYTES = 64 * 1024 * 1024
+
+
+def approx_size(value):
+    # 答えが占めるおおよそのバイト数（入れ物と中身をたどって sys.getsizeof を足す。同じものは1回だけ数える）
+    seen = set()
+    total = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        elif hasattr(obj, "nbytes"):
+            total += obj.nbytes
+        elif hasattr(obj, "__dict__"):
+            stack.append(obj.__dict__)
+    return total
+
+
+class CanonicalForm:
+    def __init__(self, digest, order):
+        self.digest = digest
+        self.order = order                                  # 標準形の番号 -> ノード
+        self.index = {node: i for i, node in enumerate(order)}   # ノード -> 標準形の番号
+
+
+def _refine(colors, out_edges, in_edges):
+    # 色の細分化: 隣接ノードの色と辺の値の組で色を分け、変わらなくなるまで繰り返す
+    while True:
+        signatures = {}
+        for v in colors:
+            out_sig = tuple(sorted((colors[u], w) for u, w in out_edges[v]))
+            in_sig = tuple(sorted((colors[u], w) for u, w in in_edges[v])) if in_edges is not None else ()
+            signatures[v] = (colors[v], out_sig, in_sig)
+        # ノード名ではなくシグネチャの大小で番号を振るので、名前の付け方によらない
+        ranks = {sig: i for i, sig in enumerate(sorted(set(signatures.values())))}
+        refined = {v: ranks[signatures[v]] for v in colors}
+        if len(ranks) == len(set(colors.values())):
+            return refined
+        colors = refined
+
+
+def canonical_form(G, attr, max_nodes=CANONICAL_MAX_NODES, max_leaves=MAX_LEAVES):
+    n = G.number_of_nodes()
+    if n == 0 or n > max_nodes:
+        return None
+    directed = G.is_directed()
+    nodes = list(G)
+    out_edges = {v: [] for v in nodes}
+    in_edges = {v: [] for v in nodes} if directed else None
+    for u, v, w in G.edges(data=attr):
+        w = _canonical(w)
+        out_edges[u].append((v, w))
+        if directed:
+            in_edges[v].append((u, w))
+        elif u != v:
+            out_edges[v].append((u, w))
+
+    best = None
+    leaves = 0
+    stack = [_refine({v: 0 for v in nodes}, out_edges, in_edges)]
+    while stack:
+        colors = stack.pop()
+        cells = {}
+        for v, c in colors.items():
+            cells.setdefault(c, []).append(v)
+        if len(cells) == n:
+            # すべてのノードの色が異なる: 色の順に並べたときの辺の一覧を比べ、最小のものを標準形にする
+            leaves += 1
+            if leaves > max_leaves:
+                return None
+            order = sorted(nodes, key=colors.__getitem__)
+            code = _encode(colors, G, attr, directed)
+            if best is None or code < best[0]:
+                best = (code, order)
+            continue
+        # 同じ色のノードが残っていれば、最も小さい色のグループの各ノードを1つずつ区別して試す
+        cell = min((c for c, vs in cells.items() if len(vs) > 1), key=lambda c: (len(cells[c]), c))
+        for v in cells[cell]:
+            split = {u: 2 * c for u, c in colors.items()}
+            split[v] = 2 * cell - 1
+            stack.append(_refine(split, out_edges, in_edges))
+
+    code, order = best
+    h = hashlib.blake2b(digest_size=16)
+    h.update(repr((directed, n, code)).encode())
+    return CanonicalForm(h.hexdigest(), order)
+
+
+def _encode(colors, G, attr, directed):
+    edges = []
+    for u, v, w in G.edges(data=attr):
+        i, j = colors[u], colors[v]
+        if not directed and j < i:
+            i, j = j, i
+        edges.append((i, j, _canonical(w)))
+    edges.sort()
+    return tuple(edges)
+
+
+class SolutionCache:
+    def __init__(self, max_entries=4096, max_bytes=MAX_BYTES, canonical_max_nodes=CANONICAL_MAX_NODES):
+        self.solutions = LRUCache(max_entries=max_entries, max_bytes=max_bytes, sizeof=approx_size)
+        self.forms = LRUCache(max_entries=1024)
+        self.canonical_max_nodes = canonical_max_nodes
+
+    def _form(self, G, fingerprint, attr):
+        key = (fingerprint, attr)
+        form = self.forms.get(key)
+        if form is None:
+            # 標準形が作れないグラフは False を覚えておく（毎回やり直さない）
+            form = canonical_form(G, attr, self.canonical_max_nodes) or False
+            self.forms.put(key, form)
+        return form or None
+
+    # kind: 問題の種類、attr: 重み/容量の属性名、nodes: 出発点・終点など（ノードのタプル）
+    # solve(): 実際に解く関数。encode(答え, index) / decode(値, order) で標準形の番号との間を変換する
+    def lookup(self, kind, G, attr, nodes, solve, encode, decode):
+        # ArrayGraph から変換したグラフは計算済みのフィンガープリントをそのまま使う（毎回ハッシュを作らない）
+        fingerprint = G.graph.get("frozen_fingerprint") or graph_fingerprint(G)
+        form = self._form(G, fingerprint, attr)
+        if form is None:
+            # ノード名込みのキー。キャッシュの値をそのまま返すので、呼び出し側で書き換えないこと
+            key = (kind, fingerprint, attr, nodes)
+            value = self.solutions.get(key)
+            if value is None:
+                value = solve()
+                self.solutions.put(key, value)
+            return value
+        key = (kind, form.digest, attr, tuple(form.index[v] for v in nodes))
+        value = self.solutions.get(key)
+        if value is None:
+            result = solve()
+            self.solutions.put(key, encode(result, form.index))
+            return result
+        return decode(value, form.order)
+
+    def clear(self):
+        self.solutions.clear()
+        self.forms.clear()
+
+    def stats(self):
+        stats = self.solutions.stats()
+        stats["canonical_forms"] = self.forms.stats()["entries"]
+        return stats
+
+
+solution_cache = SolutionCache()
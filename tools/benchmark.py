@@ -0,0 +1,170 @@
+# 生成・求解・レイアウト・描画のベンチマーク
+#   python tools/benchmark.py --out before.json              # 計測して JSON に保存
+#   python tools/benchmark.py --baseline before.json         # 前の結果と比べ、遅くなった項目を報告
+#   python tools/benchmark.py --quick                        # 授業で使う大きさ（5〜26ノード）と 1万辺まで
+# 大きさは授業で使う 5〜26 ノードから 10^5 辺まで。各項目は何回か実行して中央値と最小値を記録する。
+# 比較では最小値を使い、--threshold（既定 25%）より遅くなった項目があれば終了コード 1 を返す。
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import matplotlib  # noqa: E402
+import networkx as nx  # noqa: E402
+import numpy as np  # noqa: E402
+
+from graph_flow import FlowNetwork  # noqa: E402
+from graph_generator import random_connected_graph  # noqa: E402
+from graph_layout import compute_layout  # noqa: E402
+from graph_render import figure_cache, render_graph  # noqa: E402
+from graph_solver import solve_shortest_path  # noqa: E402
+from solution_cache import solution_cache  # noqa: E402
+
+# (名前, ノード数, 追加の辺の密度。None はランダム問題のページと同じ n//2〜n 本)
+SIZES = [
+    ("n5", 5, None),
+    ("n10", 10, None),
+    ("n26", 26, None),
+    ("e1e3", 200, 4.0),
+    ("e1e4", 2000, 4.0),
+    ("e1e5", 20000, 4.0),
+]
+QUICK_SIZES = ("n5", "n10", "n26", "e1e3", "e1e4")
+
+# 大きなグラフでは現実的でない項目の上限（辺数）
+# networkx の spring_layout は 500 ノードを超えると scipy が必要になる
+LIMITS = {
+    "layout_spring": 1_000,
+    "layout_spectral": 10_000,
+    "render_png": 2_000,
+    "render_svg": 10_000,
+}
+
+
+def measure(func, repeats, budget=3.0):
+    # 1回が重い項目は、合計が budget 秒を超えたところで打ち切る
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if sum(times) > budget:
+            break
+    return {"median_ms": statistics.median(times) * 1000, "min_ms": min(times) * 1000, "repeats": len(times)}
+
+
+def bench_size(label, n, density, seed):
+    repeats = 20 if n <= 26 else (5 if n <= 2000 else 3)
+    AG = random_connected_graph(n, density=density, seed=seed)
+    G = AG.to_networkx()
+    DAG = random_connected_graph(n, density=density, weight_range=(5, 20), directed=True,
+                                 attr="capacity", seed=seed)
+    m = G.number_of_edges()
+    nodes = list(G)
+    source, target = nodes[0], nodes[-1]
+
+    def solve_sp():
+        solution_cache.clear()
+        solve_shortest_path(G, source, target)
+
+    def solve_mf():
+        FlowNetwork(DAG).solve(source, target)
+
+    pos = compute_layout(G, "force", seed=seed)
+    labels = {(u, v): f"{w}" for u, v, w in G.edges(data="weight")}
+
+    def render(backend):
+        def run():
+            figure_cache.clear()
+            render_graph(G, pos, edge_labels=labels, backend=backend)
+        return run
+
+    cases = {
+        "generate": lambda: random_connected_graph(n, density=density, seed=seed).to_networkx(),
+        "solve_shortest_path": solve_sp,
+        "solve_max_flow": solve_mf,
+        "layout_spring": lambda: compute_layout(G, "spring", seed=seed),
+        "layout_force": lambda: compute_layout(G, "force", seed=seed),
+        "layout_spectral": lambda: compute_layout(G, "spectral", seed=seed),
+        "render_png": render("matplotlib"),
+        "render_svg": render("svg"),
+    }
+    results = {}
+    for stage, func in cases.items():
+        if m > LIMITS.get(stage, float("inf")):
+            continue
+        result = measure(func, repeats)
+        result.update(nodes=n, edges=m)
+        results[f"{stage}/{label}"] = result
+        print(f"  {stage:<22}{label:<7}{m:>8} edges {result['median_ms']:>10.2f} ms (min {result['min_ms']:.2f})",
+              flush=True)
+    return results
+
+
+def compare(results, baseline, threshold, floor_ms=0.05):
+    # 最小値どうしを比べる（小さな値の揺れで騒がないよう、差が floor_ms 未満は無視）
+    regressions = []
+    print(f"\n{'case':<32}{'baseline':>12}{'now':>12}{'ratio':>8}")
+    for key in sorted(results):
+        if key not in baseline:
+            continue
+        before, now = baseline[key]["min_ms"], results[key]["min_ms"]
+        ratio = now / before if before > 0 else float("inf")
+        mark = ""
+        if ratio > 1 + threshold and now - before > floor_ms:
+            regressions.append(key)
+            mark = "  <-- slower"
+        print(f"{key:<32}{before:>10.2f}ms{now:>10.2f}ms{ratio:>8.2f}{mark}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="生成・求解・レイアウト・描画のベンチマーク")
+    parser.add_argument("--out", help="結果を保存する JSON ファイル")
+    parser.add_argument("--baseline", help="比較する前回の結果（JSON）")
+    parser.add_argument("--threshold", type=float, default=0.25, help="遅くなったとみなす割合（0.25 = 25%%）")
+    parser.add_argument("--quick", action="store_true", help="10^5 辺の計測を省く")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = {}
+    for label, n, density in SIZES:
+        if args.quick and label not in QUICK_SIZES:
+            continue
+        print(f"{label}: {n} nodes", flush=True)
+        results.update(bench_size(label, n, density, args.seed))
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "networkx": nx.__version__,
+            "numpy": np.__version__,
+            "matplotlib": matplotlib.__version__,
+        },
+        "results": results,
+    }
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\nsaved to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) slower than the baseline by more than {args.threshold:.0%}")
+            return 1
+        print("\nno regressions")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
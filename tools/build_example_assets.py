@@ -0,0 +1,40 @@
+# 例題ページ（最短経路・最大流）の図と答えを前もって作る
+#   python tools/build_example_assets.py                 # data/examples に書き出す
+#   python tools/build_example_assets.py --out /srv/examples --formats png
+# 例題の固定グラフ（example_assets.EXAMPLES）ごとに、問題の図と、全ての (出発点, 終点) の答えと
+# 答えを書き込んだ図を書き出す。書き出したあとは、例題ページはファイルを読むだけでグラフの計算をしない。
+# 出力先を変えたときは、アプリを GRAPH_EXAMPLE_DIR=出力先 で起動する。
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_assets import EXAMPLE_DIR, EXAMPLES, FIGURE_FORMATS, ExampleAssets  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="例題ページの図と答えを前もって作る")
+    parser.add_argument("--out", default=EXAMPLE_DIR, help="出力先のディレクトリ")
+    parser.add_argument("--formats", default=",".join(FIGURE_FORMATS), help="図の形式（png,svg）")
+    parser.add_argument("--only", choices=sorted(EXAMPLES), help="この例題だけを作る")
+    args = parser.parse_args()
+
+    formats = [fmt for fmt in args.formats.split(",") if fmt]
+    for fmt in formats:
+        if fmt not in FIGURE_FORMATS:
+            parser.error(f"未対応の形式です: {fmt}")
+    for name in sorted(EXAMPLES):
+        if args.only and name != args.only:
+            continue
+        start = time.perf_counter()
+        assets = ExampleAssets(name, directory=args.out)
+        count = assets.build(formats)
+        print(f"{name}: {len(assets.pairs())} pairs, {count} figures -> {assets.directory} "
+              f"({time.perf_counter() - start:.1f} s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+# 道路網モードの索引（メモリマップ用の配列 + ALT のランドマーク距離）を作る
+#   python tools/build_road_index.py --edges akita_edges.txt --nodes akita_nodes.txt
+#   python tools/build_road_index.py --synthetic 100000   # 動作確認用の格子状の道路網
+# 入力:
+#   --edges  1行に「始点ID 終点ID 長さ(m)」（OpenStreetMap などから書き出した辺リスト。双方向として扱う）
+#   --nodes  1行に「ノードID 緯度 経度」（省略可。あると地点名の割り当てと地図表示ができる）
+#   --places 「地点名,緯度,経度」の CSV（省略すると秋田県内の主な市の座標を使う）
+# 出力先（--out、既定は data/road_akita）のファイルは、アプリが最初に使うときにメモリマップで読む。
+import argparse
+import csv
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import numpy as np  # noqa: E402
+
+from graph_array import ArrayGraph  # noqa: E402
+from road_network import (  # noqa: E402
+    AKITA_PLACES, ROAD_INDEX_DIR, RoadIndex, choose_landmarks, largest_component, nearest_nodes,
+)
+
+
+def read_edges(path):
+    ids, src, dst, lengths = {}, [], [], []
+    with open(path, encoding="utf-8") as f:
+        for lineno, line in enumerate(f, 1):
+            line = line.split("#", 1)[0].strip()
+            if not line:
+                continue
+            parts = line.replace(",", " ").split()
+            if len(parts) != 3:
+                sys.exit(f"{path}:{lineno}: 「始点ID 終点ID 長さ」の形になっていません")
+            u, v, length = parts
+            if u == v:
+                continue
+            src.append(ids.setdefault(u, len(ids)))
+            dst.append(ids.setdefault(v, len(ids)))
+            lengths.append(float(length))
+    return list(ids), np.array(src, dtype=np.int64), np.array(dst, dtype=np.int64), np.array(lengths)
+
+
+def read_coords(path, labels):
+    index = {label: i for i, label in enumerate(labels)}
+    coords = np.full((len(labels), 2), np.nan)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split("#", 1)[0].replace(",", " ").split()
+            if len(parts) == 3 and parts[0] in index:
+                coords[index[parts[0]]] = float(parts[1]), float(parts[2])
+    return coords
+
+
+def read_places(path):
+    with open(path, encoding="utf-8") as f:
+        return {row[0]: (float(row[1]), float(row[2])) for row in csv.reader(f) if len(row) >= 3}
+
+
+def synthetic_network(n, seed=0):
+    # 秋田県の範囲に、少し歪ませた格子状の道路網を作る（辺の 1 割ほどは間引く）
+    rng = np.random.default_rng(seed)
+    side = int(math.ceil(math.sqrt(n)))
+    lat0, lat1, lon0, lon1 = 39.0, 40.5, 139.7, 140.9
+    row, col = np.divmod(np.arange(side * side), side)
+    lat = lat0 + (lat1 - lat0) * (row + rng.uniform(-0.3, 0.3, row.shape)) / side
+    lon = lon0 + (lon1 - lon0) * (col + rng.uniform(-0.3, 0.3, col.shape)) / side
+    ids = np.arange(side * side).reshape(side, side)
+    src = np.concatenate([ids[:, :-1].ravel(), ids[:-1, :].ravel()])
+    dst = np.concatenate([ids[:, 1:].ravel(), ids[1:, :].ravel()])
+    keep = rng.random(len(src)) < 0.9
+    src, dst = src[keep], dst[keep]
+    # 緯度・経度の差をメートルに直し、道の曲がりの分だけ長くする
+    dy = (lat[src] - lat[dst]) * 111_000
+    dx = (lon[src] - lon[dst]) * 111_000 * math.cos(math.radians((lat0 + lat1) / 2))
+    lengths = np.round(np.hypot(dx, dy) * rng.uniform(1.0, 1.4, len(src)), 1)
+    labels = [str(i) for i in range(side * side)]
+    return labels, src, dst, lengths, np.stack([lat, lon], axis=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="道路網モードの索引を作る")
+    parser.add_argument("--edges", help="辺リスト（始点ID 終点ID 長さ[m]）")
+    parser.add_argument("--nodes", help="ノードの座標（ノードID 緯度 経度）")
+    parser.add_argument("--places", help="地点名の CSV（地点名,緯度,経度）")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="辺リストの代わりに N ノードの格子状の道路網を作る")
+    parser.add_argument("--landmarks", type=int, default=16)
+    parser.add_argument("--out", default=ROAD_INDEX_DIR)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    if not args.edges and not args.synthetic:
+        parser.error("--edges か --synthetic を指定してください")
+
+    begin = time.perf_counter()
+    if args.synthetic:
+        labels, src, dst, lengths, coords = synthetic_network(args.synthetic, seed=args.seed)
+    else:
+        labels, src, dst, lengths = read_edges(args.edges)
+        coords = read_coords(args.nodes, labels) if args.nodes else None
+    labels, src, dst, lengths, keep = largest_component(labels, src, dst, lengths)
+    if coords is not None:
+        coords = np.ascontiguousarray(coords[keep])
+    graph = ArrayGraph.from_edges(labels, src, dst, lengths, attr="length")
+    print(f"graph: {graph.number_of_nodes()} nodes, {graph.number_of_edges()} edges "
+          f"({time.perf_counter() - begin:.1f}s)")
+
+    _, landmarks = choose_landmarks(graph, k=args.landmarks, seed=args.seed, log=print)
+    places = {}
+    if coords is not None and not np.isnan(coords).any():
+        places = nearest_nodes(coords, read_places(args.places) if args.places else AKITA_PLACES)
+    elif coords is not None:
+        print("座標のないノードがあるため、地点名の割り当てと地図表示は行いません")
+        coords = None
+    RoadIndex(graph, landmarks, coords, places).save(args.out)
+    size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+    print(f"saved to {args.out} ({size / 1e6:.1f} MB, {time.perf_counter() - begin:.1f}s)")
+
+
+if __name__ == "__main__":
+    main()
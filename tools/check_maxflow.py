@@ -0,0 +1,89 @@
+# 最大流エンジン（graph_flow）の検証とベンチマーク
+#   python tools/check_maxflow.py
+# ランダムな有向グラフで networkx と流量・流量保存則・最小カットを照合し、
+# 辺数の多いグラフで networkx との実行時間を比べる。
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import networkx as nx  # noqa: E402
+
+from graph_array import ArrayGraph  # noqa: E402
+from graph_flow import FlowNetwork  # noqa: E402
+
+
+def random_network(rng, n, m, directed=True):
+    G = nx.gnm_random_graph(n, m, seed=rng.randint(0, 10**9), directed=directed)
+    for u, v in G.edges:
+        G[u][v]["capacity"] = rng.randint(1, 20)
+    return G
+
+
+def check_result(G, result, s, t, expected):
+    if result.flow_value != expected:
+        return f"flow {result.flow_value} != {expected}"
+    flow = result.flow_dict()
+    for u, v, c in G.edges(data="capacity"):
+        f = flow[u][v]
+        if G.is_directed() and not 0 <= f <= c:
+            return f"edge {u}->{v} flow {f} outside [0, {c}]"
+    for u in G:
+        if u in (s, t):
+            continue
+        # 無向グラフの flow_dict は逆向きを負の値で持つので、出る量の合計が 0 になる
+        inflow = sum(flow[v][u] for v in G.predecessors(u)) if G.is_directed() else 0
+        if inflow != sum(flow[u].values()):
+            return f"conservation violated at {u}"
+    reachable, rest = result.min_cut()
+    cut_value = sum(c for u, v, c in G.edges(data="capacity") if u in reachable and v in rest)
+    if not G.is_directed():
+        cut_value += sum(c for u, v, c in G.edges(data="capacity") if v in reachable and u in rest)
+    if cut_value != expected:
+        return f"cut {cut_value} != {expected}"
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    failures = 0
+    for i in range(args.cases):
+        directed = i % 4 != 0
+        n = rng.randint(2, 30)
+        G = random_network(rng, n, rng.randint(0, n * 3), directed)
+        s, t = rng.sample(list(G), 2)
+        expected = nx.maximum_flow_value(G, s, t, capacity="capacity")
+        network = FlowNetwork(G)
+        for method in ("dinic", "push_relabel"):
+            error = check_result(G, network.solve(s, t, method), s, t, expected)
+            if error:
+                failures += 1
+                print(f"NG case {i} ({method}): {error}")
+    print(f"validation: {args.cases} cases, {failures} failures")
+
+    print("edges      networkx   dinic      push_relabel")
+    for n, m in [(200, 2000), (1000, 5000), (2000, 20000)]:
+        G = random_network(rng, n, m)
+        s, t = 0, n - 1
+        times = []
+        start = time.perf_counter()
+        nx.maximum_flow(G, s, t, capacity="capacity")
+        times.append(time.perf_counter() - start)
+        for method in ("dinic", "push_relabel"):
+            start = time.perf_counter()
+            FlowNetwork(ArrayGraph.from_networkx(G, "capacity")).solve(s, t, method)
+            times.append(time.perf_counter() - start)
+        print(f"{m:<10} " + " ".join(f"{x * 1000:8.1f}ms" for x in times))
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,246 @@
+# 提出された答えをまとめて採点する（授業後に、紙やエクスポートした答えを一括で採点する）
+#   python tools/grade_submissions.py submissions.jsonl > results.jsonl
+#   python tools/grade_submissions.py submissions.jsonl --out results.jsonl --workers 4
+#   cat submissions.jsonl | python tools/grade_submissions.py -
+# 入力は1行に1つの提出（JSON）。問題は次のどれかで指定する:
+#   {"id": "s01", "puzzle": "shortest", "source": "Start", "target": "Goal", "answer": 105}
+#       … 例題（example_assets.EXAMPLES の名前）。shortest は最短経路、maxflow は最大流
+#   {"id": "s02", "kind": "max_flow", "graph": {"directed": true, "edges": [["S", "A", 10], ...]},
+#    "source": "S", "target": "T", "answer": 15}
+#   {"id": "s03", "kind": "shortest_path", "graph_file": "class1.csv", "source": "A", "target": "D", "answer": 12}
+#       … graph_io で読める形式のファイル（"directed" を省略すると最大流は有向、最短経路は無向）
+# 同じグラフの問題は1回だけ解き、グラフを何個かずつまとめてプロセスプールで並列に解く。
+# 結果は入力と同じ順に、解け次第1行ずつ書き出す:
+#   {"line": 1, "id": "s01", "source": ..., "target": ..., "answer": 105, "expected": 105, "correct": true, ...}
+# 読めない行・存在しないノードなどは {"line": ..., "error": "..."} を書き出して次へ進む。
+# 経路がない組の正解は、最短経路なら null（答えも null のときだけ正解）、最大流なら 0。
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from example_assets import EXAMPLES  # noqa: E402
+
+KINDS = ("shortest_path", "max_flow")
+ATTRS = {"shortest_path": "weight", "max_flow": "capacity"}
+
+
+class SubmissionError(ValueError):
+    pass
+
+
+# --- 提出1行から (問題の種類, 有向か, 辺の一覧) を作る ---
+def _node(value):
+    # JSON の配列などはグラフのノードにできないので、文字列・数値だけを受け付ける
+    if isinstance(value, (str, int, float)) and not isinstance(value, bool):
+        return value
+    raise SubmissionError(f"ノードは文字列か数値にしてください: {value!r}")
+
+
+def _edges_from_json(edges):
+    rows = []
+    for i, edge in enumerate(edges, 1):
+        if not isinstance(edge, (list, tuple)) or len(edge) != 3:
+            raise SubmissionError(f"{i}本目の辺は [始点, 終点, 値] にしてください")
+        u, v, value = edge
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise SubmissionError(f"{i}本目の辺の値が数値ではありません: {value!r}")
+        rows.append((_node(u), _node(v), value))
+    return tuple(rows)
+
+
+def _edges_from_file(path, kind, directed):
+    from graph_io import GraphImportError, guess_format, read_graph
+
+    attr = ATTRS[kind]
+    try:
+        with open(path, "rb") as f:
+            fmt = guess_format(path, f.read(256).decode("utf-8", "replace"))
+            f.seek(0)
+            G = read_graph(f, fmt, directed=directed, attr=attr)
+    except (OSError, GraphImportError) as e:
+        raise SubmissionError(f"グラフのファイルを読めません: {path}: {e}")
+    return tuple((u, v, w) for u, v, w in G.edges(data=attr)), tuple(G.nodes)
+
+
+class SubmissionReader:
+    def __init__(self, base_dir="."):
+        self.base_dir = base_dir
+        self._files = {}
+
+    # 戻り値: (問題の種類, 有向か, 辺の一覧, 辺のないノードも含むノードの一覧)
+    def puzzle(self, sub):
+        if "puzzle" in sub:
+            spec = EXAMPLES.get(sub["puzzle"])
+            if spec is None:
+                raise SubmissionError(f"例題がありません: {sub['puzzle']!r}（{', '.join(sorted(EXAMPLES))}）")
+            # 例題は有向なら最大流、無向なら最短経路（example_assets と同じ分け方）
+            kind = "max_flow" if spec["directed"] else "shortest_path"
+            return kind, spec["directed"], tuple(tuple(e) for e in spec["edges"]), ()
+        kind = sub.get("kind")
+        if kind not in KINDS:
+            raise SubmissionError(f"kind は {' か '.join(KINDS)} にしてください: {kind!r}")
+        if "graph" in sub:
+            graph = sub["graph"]
+            if not isinstance(graph, dict) or not isinstance(graph.get("edges"), list):
+                raise SubmissionError('graph は {"directed": ..., "edges": [[始点, 終点, 値], ...]} にしてください')
+            directed = bool(graph.get("directed", kind == "max_flow"))
+            nodes = tuple(_node(v) for v in graph.get("nodes", ()))
+            return kind, directed, _edges_from_json(graph["edges"]), nodes
+        if "graph_file" in sub:
+            directed = bool(sub.get("directed", kind == "max_flow"))
+            path = os.path.join(self.base_dir, sub["graph_file"])
+            key = (path, kind, directed)
+            if key not in self._files:
+                self._files[key] = _edges_from_file(path, kind, directed)
+            edges, nodes = self._files[key]
+            return kind, directed, edges, nodes
+        raise SubmissionError("puzzle・graph・graph_file のどれかで問題を指定してください")
+
+
+# --- グラフ1つ分の組をまとめて解く（プロセスプールのワーカーで動く） ---
+def solve_graph(kind, directed, edges, nodes, pairs):
+    import networkx as nx
+
+    from graph_flow import solve_max_flow
+    from graph_solver import solve_shortest_path
+
+    attr = ATTRS[kind]
+    G = nx.DiGraph() if directed else nx.Graph()
+    G.add_nodes_from(nodes)
+    G.add_weighted_edges_from(edges, weight=attr)
+    answers = {}
+    for source, target in pairs:
+        if source not in G or target not in G:
+            missing = source if source not in G else target
+            answers[(source, target)] = {"error": f"ノード {missing!r} はグラフにありません"}
+        elif source == target:
+            answers[(source, target)] = {"error": "出発点と終点が同じです"}
+        elif kind == "shortest_path":
+            try:
+                path, length = solve_shortest_path(G, source, target, weight=attr)
+                answers[(source, target)] = {"expected": length, "path": path}
+            except nx.NetworkXNoPath:
+                answers[(source, target)] = {"expected": None}
+        elif nx.has_path(G, source, target):
+            answers[(source, target)] = {"expected": solve_max_flow(G, source, target, capacity=attr).flow_value}
+        else:
+            answers[(source, target)] = {"expected": 0}
+    return answers
+
+
+# 小さなグラフが多いときにプロセス間のやりとりが増えすぎないよう、何個かずつまとめて渡す
+def solve_batch(batch):
+    return [solve_graph(*puzzle, pairs) for puzzle, pairs in batch]
+
+
+def is_correct(answer, expected, tolerance):
+    if expected is None or answer is None:
+        return expected is None and answer is None
+    if isinstance(answer, bool) or not isinstance(answer, (int, float)):
+        return False
+    # tolerance は正解に対する割合（0 ならページと同じく完全一致）
+    return math.isclose(answer, expected, rel_tol=tolerance, abs_tol=1e-9)
+
+
+def read_submissions(stream, reader):
+    # (行番号, 提出, グラフのキー) か (行番号, None, エラー文) を返す
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            sub = json.loads(line)
+            if not isinstance(sub, dict):
+                raise SubmissionError("1行に1つの JSON オブジェクトにしてください")
+            for field in ("source", "target", "answer"):
+                if field not in sub:
+                    raise SubmissionError(f"{field} がありません")
+            sub["source"], sub["target"] = _node(sub["source"]), _node(sub["target"])
+            yield number, sub, reader.puzzle(sub)
+        except (ValueError, TypeError) as e:
+            # json.JSONDecodeError と SubmissionError はどちらも ValueError
+            yield number, None, str(e)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="提出された答え（JSONL）をまとめて採点する")
+    parser.add_argument("submissions", help="提出の JSONL ファイル（- で標準入力）")
+    parser.add_argument("--out", default="-", help="結果の JSONL の書き出し先（- で標準出力）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="解くプロセスの数（0 ならこのプロセスで解く）")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="正解とみなす誤差（正解に対する割合。道路網なら 0.1 など）")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.submissions == "-":
+        base_dir = "."
+        rows = list(read_submissions(sys.stdin, SubmissionReader(base_dir)))
+    else:
+        base_dir = os.path.dirname(os.path.abspath(args.submissions))
+        with open(args.submissions, encoding="utf-8-sig") as f:
+            rows = list(read_submissions(f, SubmissionReader(base_dir)))
+
+    # 同じグラフの提出をまとめ、グラフごとに必要な (出発点, 終点) を集める
+    graphs = {}
+    for _, sub, puzzle in rows:
+        if sub is not None:
+            graphs.setdefault(puzzle, {})[(sub["source"], sub["target"])] = None
+
+    items = [(puzzle, list(pairs)) for puzzle, pairs in graphs.items()]
+    executor = ProcessPoolExecutor(max_workers=args.workers) if args.workers > 0 and len(items) > 1 else None
+    # ワーカー1つあたり4回くらいに分けて渡す（先頭の結果から順に書き出せるように）
+    size = max(1, math.ceil(len(items) / (4 * args.workers))) if executor is not None else len(items) or 1
+    batches = {}
+    for i in range(0, len(items), size):
+        batch = items[i:i + size]
+        if executor is not None:
+            future = executor.submit(solve_batch, batch)
+        else:
+            future = Future()
+            future.set_result(solve_batch(batch))
+        for j, (puzzle, _) in enumerate(batch):
+            batches[puzzle] = (future, j)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8")
+    graded = correct = errors = 0
+    try:
+        # 入力の順に、そのグラフが解け次第書き出す
+        for number, sub, puzzle in rows:
+            if sub is None:
+                record = {"line": number, "error": puzzle}
+            else:
+                record = {"line": number, "id": sub.get("id"), "source": sub["source"], "target": sub["target"],
+                          "answer": sub["answer"]}
+                try:
+                    future, j = batches[puzzle]
+                    solved = future.result()[j][(sub["source"], sub["target"])]
+                except Exception as e:
+                    solved = {"error": f"解けませんでした: {e}"}
+                record.update(solved)
+                if "error" not in solved:
+                    record["correct"] = is_correct(sub["answer"], solved["expected"], args.tolerance)
+                    graded += 1
+                    correct += record["correct"]
+            errors += "error" in record
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+        if executor is not None:
+            executor.shutdown()
+
+    print(f"{graded} graded ({correct} correct), {errors} errors, {len(graphs)} graphs "
+          f"in {time.perf_counter() - start:.2f} s", file=sys.stderr)
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
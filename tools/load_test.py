@@ -0,0 +1,286 @@
+# 複数の生徒が同時に使ったときの負荷試験（ブラウザなし）
+#   python tools/load_test.py --users 10 --duration 60
+#   python tools/load_test.py --users 1,5,10,20,40 --duration 30 --out load.json   # 人数を段階的に増やす
+#   python tools/load_test.py --url http://localhost:8501 --pid 12345              # 起動済みのサーバーを使う
+# streamlit run Home.py でサーバーを起動し、生徒1人につき1本の WebSocket をつないで、
+# ブラウザと同じ形式のメッセージ（BackMsg / ForwardMsg）でページを操作する。
+# 各生徒は「ランダムなページを開く → グラフを生成 → 出発点・終点を変える → 解答 → やり直し」を
+# 考える時間（--think）をはさみながら繰り返す。ウィジェットはラベルで探し、
+# フラグメントの中のウィジェットはブラウザと同じくフラグメントだけを再実行させる。
+#   ・処理できた再実行の数（回/秒）
+#   ・再実行1回の時間（送信してから script_finished が届くまで）の p50 / p95 / p99（操作ごとにも集計）
+#   ・サーバーの RSS の推移（Linux の /proc から読む）
+# を出す。人数ごとの p95 が目安（たとえば 1 秒）を超えるところが、1台で受け持てる人数の上限。
+# WebSocket のクライアントに websockets を使う（アプリには不要なので requirements.txt には入れていない）:
+#   pip install websockets
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    import websockets  # noqa: E402
+except ImportError:
+    websockets = None
+WEBSOCKETS_MISSING = "websockets が入っていません。pip install websockets で入れてから実行してください。"
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+
+from rerun_timing import percentile  # noqa: E402
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+PAGES = ["shotest_fixed", "maxflow_fixed", "shotest_random", "maxflow_random", "shotest_free", "maxflow_free"]
+GENERATE_LABELS = ("グラフを生成する", "＋ ノードを追加")
+SOURCE_LABELS = ("出発点", "始点ノード")
+TARGET_LABELS = ("到達点", "終点", "終点ノード")
+SUBMIT_LABELS = ("解答", "解答する", "辺を追加", "有向辺を追加")
+RESET_LABELS = ("もう一度挑戦する", "🔁 もう一度挑戦する", "同じ問題で挑戦する", "問題を作り直す")
+WIDGET_TYPES = ("button", "selectbox", "number_input")
+
+
+def rss_mb(pid):
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+# --- サーバーの起動 ---
+def start_server(port, env=None):
+    cmd = [sys.executable, "-m", "streamlit", "run", "Home.py", "--server.headless", "true",
+           "--server.port", str(port), "--browser.gatherUsageStats", "false"]
+    proc = subprocess.Popen(cmd, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://localhost:{port}"
+    for _ in range(300):
+        try:
+            with urllib.request.urlopen(url + "/_stcore/health", timeout=1):
+                return proc, url
+        except OSError:
+            if proc.poll() is not None:
+                break
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("streamlit のサーバーが起動しませんでした")
+
+
+class Stats:
+    def __init__(self):
+        self.samples = []   # (終了時刻, 操作, 秒)
+        self.errors = 0
+
+    def since(self, start):
+        return [s for s in self.samples if s[0] >= start]
+
+
+# --- 1人の生徒（1本の WebSocket = ブラウザの1タブ） ---
+class Student:
+    def __init__(self, url, stats, rng, think, timeout):
+        self.url = url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.stats = stats
+        self.rng = rng
+        self.think = think
+        self.timeout = timeout
+        self.ws = None
+        self.page = PAGES[0]
+        self.widgets = {}    # id -> (種類, ラベル, 選択肢, フラグメントID)
+        self.values = {}     # id -> ("string_value" などのフィールド名, 値)
+
+    async def _rerun(self, action, trigger=None, fragment_id=""):
+        msg = BackMsg()
+        state = msg.rerun_script
+        state.query_string = ""
+        state.page_name = self.page
+        state.fragment_id = fragment_id
+        for widget_id, (field, value) in self.values.items():
+            ws = state.widget_states.widgets.add()
+            ws.id = widget_id
+            setattr(ws, field, value)
+        if trigger is not None:
+            ws = state.widget_states.widgets.add()
+            ws.id = trigger
+            ws.trigger_value = True
+
+        start = time.perf_counter()
+        await self.ws.send(msg.SerializeToString())
+        seen = set(self.widgets) if fragment_id else set()
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(await asyncio.wait_for(self.ws.recv(), self.timeout))
+            kind = fwd.WhichOneof("type")
+            if kind == "delta" and fwd.delta.WhichOneof("type") == "new_element":
+                element = fwd.delta.new_element
+                etype = element.WhichOneof("type")
+                if etype == "exception":
+                    self.stats.errors += 1
+                elif etype in WIDGET_TYPES:
+                    proto = getattr(element, etype)
+                    options = list(proto.options) if etype == "selectbox" else []
+                    self.widgets[proto.id] = (etype, proto.label, options, fwd.delta.fragment_id)
+                    seen.add(proto.id)
+            elif kind == "script_finished" and fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                break
+        self.stats.samples.append((time.perf_counter(), action, time.perf_counter() - start))
+        # 今回の実行で出てこなかったウィジェットは忘れる（ページ移動や選択肢の変化）
+        self.widgets = {k: v for k, v in self.widgets.items() if k in seen}
+        self.values = {k: v for k, v in self.values.items() if k in seen}
+
+    def _find(self, etype, labels):
+        found = [(wid, w) for wid, w in self.widgets.items() if w[0] == etype and w[1] in labels]
+        return self.rng.choice(found) if found else (None, None)
+
+    async def open_page(self):
+        self.page = self.rng.choice(PAGES)
+        self.widgets, self.values = {}, {}
+        await self._rerun("open")
+
+    async def generate(self):
+        wid, widget = self._find("button", GENERATE_LABELS)
+        if wid is not None:
+            await self._rerun("generate", trigger=wid, fragment_id=widget[3])
+
+    async def change_pair(self):
+        for labels in (SOURCE_LABELS, TARGET_LABELS):
+            wid, widget = self._find("selectbox", labels)
+            if wid is not None and widget[2]:
+                self.values[wid] = ("string_value", self.rng.choice(widget[2]))
+                await self._rerun("select", fragment_id=widget[3])
+
+    async def submit(self):
+        for wid, widget in self.widgets.items():
+            if widget[0] == "number_input" and "予想" in widget[1]:
+                self.values[wid] = ("double_value", float(self.rng.randint(1, 60)))
+        wid, widget = self._find("button", SUBMIT_LABELS)
+        if wid is not None:
+            await self._rerun("submit", trigger=wid, fragment_id=widget[3])
+
+    async def reset(self):
+        wid, widget = self._find("button", RESET_LABELS)
+        if wid is not None:
+            await self._rerun("reset", trigger=wid, fragment_id=widget[3])
+
+    async def loop(self, stop_at):
+        steps = [self.generate, self.change_pair, self.submit, self.reset]
+        async with websockets.connect(self.url, max_size=None) as self.ws:
+            while time.perf_counter() < stop_at:
+                try:
+                    await self.open_page()
+                    for _ in range(self.rng.randint(1, 4)):
+                        for step in steps:
+                            await asyncio.sleep(self.rng.uniform(0, self.think))
+                            if time.perf_counter() >= stop_at:
+                                return
+                            await step()
+                except asyncio.TimeoutError:
+                    # 応答がなかった操作は数えるだけにして、別のページからやり直す
+                    self.stats.errors += 1
+
+
+def latency_row(values):
+    return {"count": len(values),
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "p99_ms": percentile(values, 99) * 1000}
+
+
+async def run_level(url, pid, users, args):
+    stats = Stats()
+    start = time.perf_counter()
+    stop_at = start + args.duration
+
+    async def student(i):
+        # --ramp 秒かけて少しずつ人数を増やす
+        await asyncio.sleep(args.ramp * i / users)
+        await Student(url, stats, random.Random(args.seed + i), args.think, args.timeout).loop(stop_at)
+
+    async def monitor():
+        last = start
+        while time.perf_counter() < stop_at:
+            await asyncio.sleep(args.interval)
+            now = time.perf_counter()
+            window = [s[2] for s in stats.since(last)]
+            point = {"t": round(now - start, 1), "reruns_per_sec": len(window) / (now - last),
+                     "p95_ms": percentile(window, 95) * 1000, "rss_mb": rss_mb(pid)}
+            last = now
+            timeline.append(point)
+            rss = f"{point['rss_mb']:>7.1f} MB" if point["rss_mb"] is not None else "      - MB"
+            print(f"  t={point['t']:>6.1f}s  {point['reruns_per_sec']:>6.1f} reruns/s  "
+                  f"p95 {point['p95_ms']:>7.1f} ms  RSS {rss}", flush=True)
+
+    timeline = []
+    await asyncio.gather(monitor(), *(student(i) for i in range(users)))
+    elapsed = time.perf_counter() - start
+
+    by_action = {}
+    for _, action, seconds in stats.samples:
+        by_action.setdefault(action, []).append(seconds)
+    return {"users": users, "duration_sec": elapsed, "errors": stats.errors,
+            "reruns_per_sec": len(stats.samples) / elapsed,
+            "latency": latency_row([s[2] for s in stats.samples]),
+            "actions": {action: latency_row(values) for action, values in sorted(by_action.items())},
+            "timeline": timeline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="複数セッションでの負荷試験（WebSocket）")
+    parser.add_argument("--users", default="10", help="同時に動かす生徒の数（カンマ区切りで段階的に増やす）")
+    parser.add_argument("--duration", type=float, default=60.0, help="1段階あたりの秒数")
+    parser.add_argument("--ramp", type=float, default=5.0, help="全員がそろうまでの秒数")
+    parser.add_argument("--think", type=float, default=1.0, help="操作のあいだに考える時間の上限（秒）")
+    parser.add_argument("--interval", type=float, default=5.0, help="途中経過を出す間隔（秒）")
+    parser.add_argument("--timeout", type=float, default=60.0, help="再実行1回の制限時間（秒）")
+    parser.add_argument("--url", help="起動済みのサーバー（省略時はこのスクリプトが起動する）")
+    parser.add_argument("--pid", type=int, help="--url のサーバーのプロセス ID（RSS の計測用）")
+    parser.add_argument("--port", type=int, default=8599, help="サーバーを起動するときのポート")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="結果を保存する JSON ファイル")
+    args = parser.parse_args()
+    if websockets is None:
+        print(WEBSOCKETS_MISSING, file=sys.stderr)
+        return 2
+
+    proc = None
+    if args.url:
+        url, pid = args.url.rstrip("/"), args.pid
+    else:
+        proc, url = start_server(args.port)
+        pid = proc.pid
+    try:
+        results = []
+        for users in [int(u) for u in args.users.split(",")]:
+            print(f"{users} users", flush=True)
+            results.append(asyncio.run(run_level(url, pid, users, args)))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"\n{'users':>6}{'reruns/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'RSS MB':>10}{'errors':>8}")
+    for r in results:
+        rss = max((p["rss_mb"] for p in r["timeline"] if p["rss_mb"] is not None), default=None)
+        rss = f"{rss:>10.1f}" if rss is not None else f"{'-':>10}"
+        print(f"{r['users']:>6}{r['reruns_per_sec']:>10.1f}{r['latency']['p50_ms']:>10.1f}"
+              f"{r['latency']['p95_ms']:>10.1f}{r['latency']['p99_ms']:>10.1f}{rss}{r['errors']:>8}")
+    last = results[-1]
+    print(f"\nby action ({last['users']} users)")
+    print(f"  {'action':<10}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for action, row in last["actions"].items():
+        print(f"  {action:<10}{row['count']:>7}{row['p50_ms']:>10.1f}{row['p95_ms']:>10.1f}{row['p99_ms']:>10.1f}")
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2, ensure_ascii=False)
+        print(f"\nsaved to {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
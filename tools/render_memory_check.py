@@ -0,0 +1,67 @@
+# 描画モジュールのメモリリーク確認
+#   python tools/render_memory_check.py --reruns 2000
+# キャッシュを効かせない状態で描画を繰り返し、RSS が増え続けないことを確認する。
+import argparse
+import os
+import random
+import resource
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+import networkx as nx  # noqa: E402
+from matplotlib._pylab_helpers import Gcf  # noqa: E402
+
+import graph_render  # noqa: E402
+
+
+def current_rss_mb():
+    # Linux では /proc から現在の RSS を読む（それ以外は最大 RSS で代用）
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def random_graph(rng, n):
+    G = nx.gnm_random_graph(n, n * 2, seed=rng.randint(0, 10**9))
+    for u, v in G.edges:
+        G[u][v]["weight"] = rng.randint(5, 99)
+    return G
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--reruns", type=int, default=2000)
+    parser.add_argument("--warmup", type=int, default=200)
+    parser.add_argument("--max-growth-mb", type=float, default=20.0)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    samples = []
+    for i in range(args.warmup + args.reruns):
+        G = random_graph(rng, rng.randint(5, 12))
+        pos = nx.spring_layout(G, seed=42)
+        labels = {(u, v): d["weight"] for u, v, d in G.edges(data=True)}
+        graph_render.render_graph(G, pos, edge_labels=labels, highlight_edges=list(G.edges)[:2])
+        # キャッシュ分のメモリは除外して描画処理そのものを測る
+        graph_render.figure_cache.clear()
+        if i >= args.warmup and (i - args.warmup) % 250 == 0:
+            samples.append(current_rss_mb())
+    samples.append(current_rss_mb())
+
+    growth = samples[-1] - samples[0]
+    print("RSS (MB):", " ".join(f"{s:.1f}" for s in samples))
+    print(f"growth: {growth:.1f} MB, pyplot figures: {Gcf.get_num_fig_managers()}, "
+          f"pooled canvases: {graph_render.canvas_pool.size()}")
+    if growth > args.max_growth_mb or Gcf.get_num_fig_managers() > 0:
+        print("NG: メモリが増え続けています")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
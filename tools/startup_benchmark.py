@@ -0,0 +1,84 @@
+# 起動直後の表示時間（time-to-first-render）のベンチマーク
+#   python tools/startup_benchmark.py                    # ページごとに新しいサーバーを起動して最初の表示を測る
+#   python tools/startup_benchmark.py --after-home 3     # 先にホームを開き、3 秒待ってから各ページを開く
+#   python tools/startup_benchmark.py --no-prewarm       # 事前ウォームアップ（GRAPH_PREWARM=0）なしと比べる
+# 対象はホームと各ページ。毎回まっさらなプロセスで streamlit run Home.py を起動し、
+# WebSocket でページを要求してから script_finished が届くまでの時間を測る。
+# 2回目の表示（同じプロセス・別のセッション）の時間もあわせて出す。
+# load_test.py と同じく websockets が必要（pip install websockets）。
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+try:
+    from websockets.sync.client import connect  # noqa: E402
+except ImportError:
+    connect = None
+from streamlit.proto.BackMsg_pb2 import BackMsg  # noqa: E402
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg  # noqa: E402
+
+from load_test import WEBSOCKETS_MISSING, start_server  # noqa: E402
+
+TARGETS = ["", "shotest_fixed", "maxflow_fixed", "shotest_random", "maxflow_random",
+           "shotest_free", "maxflow_free", "shotest_road"]
+
+
+# 新しいセッションでページを開き、表示が終わるまでの秒数を返す
+def first_render(url, page):
+    with connect(url.replace("http", "ws", 1) + "/_stcore/stream", max_size=None) as ws:
+        msg = BackMsg()
+        msg.rerun_script.query_string = ""
+        msg.rerun_script.page_name = page
+        start = time.perf_counter()
+        ws.send(msg.SerializeToString())
+        while True:
+            fwd = ForwardMsg()
+            fwd.ParseFromString(ws.recv(timeout=120))
+            if fwd.WhichOneof("type") == "script_finished" and \
+                    fwd.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="起動直後の表示時間のベンチマーク")
+    parser.add_argument("--repeats", type=int, default=3, help="ページごとにサーバーを起動し直す回数")
+    parser.add_argument("--after-home", type=float, help="先にホームを開き、この秒数待ってから測る")
+    parser.add_argument("--no-prewarm", action="store_true", help="GRAPH_PREWARM=0 で起動する")
+    parser.add_argument("--port", type=int, default=8598)
+    args = parser.parse_args()
+    if connect is None:
+        print(WEBSOCKETS_MISSING, file=sys.stderr)
+        return 2
+
+    env = dict(os.environ)
+    if args.no_prewarm:
+        env["GRAPH_PREWARM"] = "0"
+
+    print(f"{'page':<18}{'server ms':>11}{'first ms':>11}{'second ms':>11}")
+    for page in TARGETS:
+        boot, first, second = [], [], []
+        for _ in range(args.repeats):
+            start = time.perf_counter()
+            proc, url = start_server(args.port, env=env)
+            try:
+                boot.append(time.perf_counter() - start)
+                if args.after_home is not None:
+                    first_render(url, "")
+                    time.sleep(args.after_home)
+                first.append(first_render(url, page))
+                second.append(first_render(url, page))
+            finally:
+                proc.terminate()
+                proc.wait()
+        print(f"{page or 'Home':<18}{statistics.median(boot) * 1000:>11.0f}"
+              f"{statistics.median(first) * 1000:>11.0f}{statistics.median(second) * 1000:>11.0f}", flush=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
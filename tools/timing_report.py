@@ -0,0 +1,38 @@
+# 処理時間ログ（GRAPH_TIMING_LOG で出力した JSONL）をページ・段階ごとに集計する
+#   GRAPH_TIMING_LOG=timing.jsonl streamlit run Home.py
+#   python tools/timing_report.py timing.jsonl
+import argparse
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from rerun_timing import summarize  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="処理時間ログの p50 / p95 を段階ごとに出す")
+    parser.add_argument("log", help="GRAPH_TIMING_LOG で書き出した JSONL")
+    parser.add_argument("--page", help="このページだけを集計する（例: shotest_random.py）")
+    args = parser.parse_args()
+
+    pages = {}
+    with open(args.log, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if args.page and entry["page"] != args.page:
+                continue
+            pages.setdefault(entry["page"], {}).setdefault(entry["stage"], []).append(entry["ms"] / 1000)
+
+    for page in sorted(pages):
+        print(page)
+        print(f"  {'stage':<10}{'count':>8}{'p50 ms':>10}{'p95 ms':>10}")
+        for stage, count, p50, p95 in summarize(pages[page]):
+            print(f"  {stage:<10}{count:>8}{p50:>10.1f}{p95:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()